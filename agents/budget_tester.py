@@ -212,8 +212,8 @@ class BudgetTesterAgent:
         result = calc.calculate_fixed_pool_mode(total_money=5000.0)
 
         # Money lasts forever with no expenses
-        assert result['months_remaining'] == float('inf')
-        assert result['days_remaining'] == float('inf')
+        assert result['months_remaining'] is None
+        assert result['days_remaining'] is None
         assert result['daily_limit'] == 0  # No budget needed
 
     def test_fixed_pool_exact_one_month(self):
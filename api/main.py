@@ -5,9 +5,9 @@ This API provides REST endpoints for the Vue.js frontend,
 wrapping the existing Python backend (database.py, calculator.py).
 """
 
-import json
 import os
 import sys
+import threading
 import logging
 from pathlib import Path
 from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Request, Response
@@ -89,12 +89,28 @@ async def validate_environment():
     logger.info("Environment validation passed - encryption and auth configured")
 
 
+# One EncryptedDatabase per (db_path, encryption_key), shared by all requests
+# so its connections stay open between them
+_databases: dict = {}
+_databases_lock = threading.Lock()
+
+
+@app.on_event("shutdown")
+async def close_databases():
+    """Close the shared database connections."""
+    with _databases_lock:
+        for db in _databases.values():
+            db.close()
+        _databases.clear()
+
+
 # Dependency: Get database instance
 def get_db() -> EncryptedDatabase:
     """
-    Dependency that provides a database instance.
+    Dependency that provides the shared database instance.
 
-    Uses the encryption key from environment variables.
+    Uses the encryption key from environment variables. The instance is
+    created on first use and reused by later requests.
 
     Database path priority:
     1. DB_PATH environment variable
@@ -118,7 +134,13 @@ def get_db() -> EncryptedDatabase:
             # Development: use local path
             db_path = str(Path(__file__).parent / "budget.db")
 
-    return EncryptedDatabase(db_path=db_path, encryption_key=encryption_key)
+    with _databases_lock:
+        db = _databases.get((db_path, encryption_key))
+        if db is None:
+            db = _databases[(db_path, encryption_key)] = EncryptedDatabase(
+                db_path=db_path, encryption_key=encryption_key
+            )
+    return db
 
 
 # Root endpoint
@@ -204,9 +226,7 @@ async def get_the_number(
         # Load expenses into calculator
         calc = BudgetCalculator()
         expenses = db.get_expenses(user_id)
-        for exp in expenses:
-            calc.add_expense(exp["name"], exp["amount"], exp["is_fixed"],
-                             exp.get("frequency", "monthly"))
+        calc.add_expenses_bulk(expenses)
 
         # Calculate "The Number" based on mode
         if budget_mode == "paycheck":
@@ -325,9 +345,11 @@ async def get_the_number(
         # Reset pool and pending contributions so users start clean with corrected math.
         pool_formula_fixed = db.get_setting("pool_formula_fixed", user_id)
         if not pool_formula_fixed:
-            db.set_setting("pool_balance", 0, user_id)
-            db.set_setting("pending_pool_contribution", 0, user_id)
-            db.set_setting("pool_formula_fixed", True, user_id)
+            db.set_settings({
+                "pool_balance": 0,
+                "pending_pool_contribution": 0,
+                "pool_formula_fixed": True,
+            }, user_id)
 
         # Get pool settings
         pool_enabled = db.get_setting("pool_enabled", user_id) == True
@@ -422,6 +444,8 @@ async def configure_budget(
     """
     logger.info(f"Budget configured for user {user_id} in {config.mode} mode")
     try:
+        updates = {}
+
         # Validate configuration based on mode
         if config.mode == "paycheck":
             if not config.monthly_income:
@@ -437,17 +461,17 @@ async def configure_budget(
                     detail="Paycheck mode requires next_payday_date or days_until_paycheck"
                 )
 
-            db.set_setting("monthly_income", config.monthly_income, user_id)
+            updates["monthly_income"] = config.monthly_income
 
             # If next_payday_date provided, use it (new approach)
             if config.next_payday_date:
-                db.set_setting("next_payday_date", config.next_payday_date.isoformat(), user_id)
-                db.set_setting("pay_frequency_days", config.pay_frequency_days or 14, user_id)
+                updates["next_payday_date"] = config.next_payday_date.isoformat()
+                updates["pay_frequency_days"] = config.pay_frequency_days or 14
                 # Clear legacy setting
-                db.set_setting("days_until_paycheck", None, user_id)
+                updates["days_until_paycheck"] = None
             else:
                 # Legacy: use days_until_paycheck directly
-                db.set_setting("days_until_paycheck", config.days_until_paycheck, user_id)
+                updates["days_until_paycheck"] = config.days_until_paycheck
 
         elif config.mode == "fixed_pool":
             if config.total_money is None:
@@ -455,29 +479,24 @@ async def configure_budget(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Fixed pool mode requires total_money"
                 )
-            db.set_setting("total_money", config.total_money, user_id)
-
-            # Save fixed pool options (Option B and C)
-            if config.target_end_date:
-                db.set_setting("target_end_date", config.target_end_date.isoformat(), user_id)
-            else:
-                # Clear it if not provided
-                db.set_setting("target_end_date", None, user_id)
+            updates["total_money"] = config.total_money
 
-            if config.daily_spending_limit:
-                db.set_setting("daily_spending_limit", config.daily_spending_limit, user_id)
-            else:
-                # Clear it if not provided
-                db.set_setting("daily_spending_limit", None, user_id)
+            # Save fixed pool options (Option B and C); cleared if not provided
+            updates["target_end_date"] = (
+                config.target_end_date.isoformat() if config.target_end_date else None
+            )
+            updates["daily_spending_limit"] = config.daily_spending_limit or None
 
         # Save budget mode
-        db.set_setting("budget_mode", config.mode, user_id)
+        updates["budget_mode"] = config.mode
 
         # Save user timezone if provided (for correct day boundary calculations)
         if config.user_timezone:
             from api.utils.dates import validate_timezone
-            validated_tz = validate_timezone(config.user_timezone)
-            db.set_setting("user_timezone", validated_tz, user_id)
+            updates["user_timezone"] = validate_timezone(config.user_timezone)
+
+        # One transaction for the whole form
+        db.set_settings(updates, user_id)
 
         return {"message": f"Budget configured successfully in {config.mode} mode"}
 
@@ -499,22 +518,28 @@ async def get_budget_config(
     Get current budget configuration for the authenticated user.
     Requires authentication.
     """
-    mode = db.get_setting("budget_mode", user_id)
+    # Fetch every key either mode may need in one query
+    settings = db.get_settings_bulk([
+        "budget_mode", "monthly_income", "next_payday_date", "pay_frequency_days",
+        "days_until_paycheck", "total_money", "target_end_date", "daily_spending_limit",
+    ], user_id)
+
+    mode = settings.get("budget_mode")
     if not mode:
         return {"configured": False}
 
     config = {"configured": True, "mode": mode}
 
     if mode == "paycheck":
-        config["monthly_income"] = db.get_setting("monthly_income", user_id)
-        config["next_payday_date"] = db.get_setting("next_payday_date", user_id)
-        config["pay_frequency_days"] = db.get_setting("pay_frequency_days", user_id)
+        config["monthly_income"] = settings.get("monthly_income")
+        config["next_payday_date"] = settings.get("next_payday_date")
+        config["pay_frequency_days"] = settings.get("pay_frequency_days")
         # Also return legacy field for backwards compatibility
-        config["days_until_paycheck"] = db.get_setting("days_until_paycheck", user_id)
+        config["days_until_paycheck"] = settings.get("days_until_paycheck")
     else:
-        config["total_money"] = db.get_setting("total_money", user_id)
-        target_end_date = db.get_setting("target_end_date", user_id)
-        daily_spending_limit = db.get_setting("daily_spending_limit", user_id)
+        config["total_money"] = settings.get("total_money")
+        target_end_date = settings.get("target_end_date")
+        daily_spending_limit = settings.get("daily_spending_limit")
         if target_end_date:
             config["target_end_date"] = target_end_date
         if daily_spending_limit:
@@ -714,20 +739,9 @@ async def import_expenses(
         # Import expenses using existing backend
         expenses, errors = import_expenses_from_file(file_obj)
 
-        # Replace existing expenses if requested
-        if replace:
-            existing = db.get_expenses(user_id)
-            for exp in existing:
-                db.delete_expense(exp["id"], user_id)
-
-        # Add imported expenses
-        imported_count = 0
-        for exp in expenses:
-            try:
-                db.add_expense(exp["name"], exp["amount"], user_id, exp["is_fixed"])
-                imported_count += 1
-            except Exception as e:
-                errors.append(f"Failed to import {exp['name']}: {str(e)}")
+        # Add imported expenses in one transaction, replacing existing ones if requested
+        imported_count, import_errors = db.bulk_add_expenses(expenses, user_id, replace=replace)
+        errors.extend(import_errors)
 
         return ImportExpensesResponse(
             imported_count=imported_count,
@@ -880,8 +894,7 @@ async def accept_pool_contribution(
     current_balance = float(db.get_setting("pool_balance", user_id) or 0)
     new_balance = current_balance + pending
 
-    db.set_setting("pool_balance", new_balance, user_id)
-    db.set_setting("pending_pool_contribution", 0, user_id)
+    db.set_settings({"pool_balance": new_balance, "pending_pool_contribution": 0}, user_id)
 
     logger.info(f"User {user_id} accepted pool contribution: ${pending:.2f}, new balance: ${new_balance:.2f}")
 
@@ -1040,8 +1053,7 @@ async def register(
         if user_data.timezone:
             from api.utils.dates import validate_timezone
             validated_tz = validate_timezone(user_data.timezone)
-            db.set_setting("user_timezone", validated_tz, user_id)
-            db.set_setting("timezone_source", "auto", user_id)
+            db.set_settings({"user_timezone": validated_tz, "timezone_source": "auto"}, user_id)
 
         # Get created user
         user = db.get_user_by_id(user_id)
@@ -1111,8 +1123,7 @@ async def login(
             if tz_source != "manual":
                 from api.utils.dates import validate_timezone
                 validated_tz = validate_timezone(credentials.timezone)
-                db.set_setting("user_timezone", validated_tz, user["id"])
-                db.set_setting("timezone_source", "auto", user["id"])
+                db.set_settings({"user_timezone": validated_tz, "timezone_source": "auto"}, user["id"])
 
         # Create access token
         access_token = create_access_token(data={"user_id": user["id"]})
@@ -1187,7 +1198,8 @@ async def logout():
 @app.post("/api/auth/forgot-password", response_model=ForgotPasswordResponse)
 async def forgot_password(
     request: Request,
-    forgot_request: ForgotPasswordRequest
+    forgot_request: ForgotPasswordRequest,
+    db: EncryptedDatabase = Depends(get_db)
 ):
     """
     Request a password reset token.
@@ -1201,7 +1213,6 @@ async def forgot_password(
     check_rate_limit(request, max_requests=5, window_seconds=300)  # 5 requests per 5 minutes
 
     # Verify username exists
-    db = EncryptedDatabase()
     user = db.get_user_by_username(forgot_request.username)
 
     if not user:
@@ -1222,7 +1233,8 @@ async def forgot_password(
 @app.post("/api/auth/reset-password", response_model=ResetPasswordResponse)
 async def reset_password(
     request: Request,
-    reset_request: ResetPasswordRequest
+    reset_request: ResetPasswordRequest,
+    db: EncryptedDatabase = Depends(get_db)
 ):
     """
     Reset password using a reset token.
@@ -1240,7 +1252,6 @@ async def reset_password(
         )
 
     # Update password
-    db = EncryptedDatabase()
     user = db.get_user_by_username(username)
 
     if not user:
@@ -1377,17 +1388,15 @@ async def export_budget_data(format: str, user_id: int = Depends(get_current_use
 
     db = get_db()
 
-    # Get budget configuration via get_setting (settings are encrypted)
+    # Get budget configuration in one query (settings are encrypted)
     setting_keys = [
         "budget_mode", "monthly_income", "next_payday_date", "pay_frequency_days",
         "days_until_paycheck", "total_money", "target_end_date", "daily_spending_limit",
         "user_timezone", "pool_enabled", "pool_balance", "pending_pool_contribution",
     ]
-    settings = {}
-    for key in setting_keys:
-        val = db.get_setting(key, user_id)
-        if val is not None:
-            settings[key] = val
+    stored = db.get_settings_bulk(setting_keys, user_id)
+    # Keep the export's row order regardless of the order rows come back in
+    settings = {key: stored[key] for key in setting_keys if stored.get(key) is not None}
 
     # Get expenses via get_expenses (returns list of dicts)
     expenses_raw = db.get_expenses(user_id)
@@ -1609,14 +1618,13 @@ async def get_admin_metrics(
     Aggregate usage metrics for admin dashboard. No PII in response.
     Protected by admin auth.
     """
-    import sqlite3 as _sqlite3
     from datetime import date, timedelta
 
     today = date.today()
     week_ago = (today - timedelta(days=7)).isoformat()
     month_ago = (today - timedelta(days=30)).isoformat()
 
-    with _sqlite3.connect(db.db_path) as conn:
+    with db.read_connection() as conn:
         cursor = conn.cursor()
 
         # --- Growth ---
@@ -1650,7 +1658,7 @@ async def get_admin_metrics(
         fixed_pool_count = 0
         for (encrypted_val,) in mode_rows:
             try:
-                val = json.loads(db._decrypt(encrypted_val))
+                val = db.decrypt_setting(encrypted_val)
                 if val == "paycheck":
                     paycheck_count += 1
                 elif val == "fixed_pool":
@@ -1663,7 +1671,7 @@ async def get_admin_metrics(
         pool_enabled_count = 0
         for (encrypted_val,) in pool_rows:
             try:
-                val = json.loads(db._decrypt(encrypted_val))
+                val = db.decrypt_setting(encrypted_val)
                 if val is True:
                     pool_enabled_count += 1
             except Exception:
@@ -1708,7 +1716,6 @@ async def get_admin_trends(
     db: EncryptedDatabase = Depends(get_db)
 ):
     """30-day daily trends + week-over-week comparisons for admin dashboard."""
-    import sqlite3 as _sqlite3
     from datetime import date, timedelta
 
     today = date.today()
@@ -1717,7 +1724,7 @@ async def get_admin_trends(
     # Build date range for gap-filling
     date_range = [(start + timedelta(days=i)).isoformat() for i in range(30)]
 
-    with _sqlite3.connect(db.db_path) as conn:
+    with db.read_connection() as conn:
         cursor = conn.cursor()
 
         # Daily active users from user_activity
@@ -1778,14 +1785,13 @@ async def get_admin_health(
     System health metrics for admin dashboard.
     Protected by admin auth.
     """
-    import sqlite3 as _sqlite3
     import shutil
 
     db_file = Path(db.db_path)
     db_size = db_file.stat().st_size if db_file.exists() else 0
 
     row_counts = {}
-    with _sqlite3.connect(db.db_path) as conn:
+    with db.read_connection() as conn:
         cursor = conn.cursor()
         for table in ["users", "settings", "expenses", "transactions", "user_activity"]:
             try:
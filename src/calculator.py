@@ -7,8 +7,7 @@ This module handles two budgeting modes:
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
 
 # Security and validation constants
 MAX_STRING_LENGTH = 200  # Maximum length for user input strings
@@ -19,21 +18,25 @@ MAX_DAYS_UNTIL_PAYCHECK = 365  # Maximum days (1 year)
 WEEKLY_TO_MONTHLY = 52 / 12  # ~4.333
 
 
-@dataclass
-class Expense:
-    """Represents a budget expense (fixed or variable)."""
+class _ExpenseFields(NamedTuple):
     name: str
     amount: float
     is_fixed: bool  # True for monthly fixed expenses, False for variable
     frequency: str = "monthly"  # 'weekly' or 'monthly'
 
-    def __post_init__(self):
-        if self.amount < 0:
-            raise ValueError(f"Expense amount cannot be negative: {self.amount}")
-        if self.amount > MAX_AMOUNT:
-            raise ValueError(f"Expense amount exceeds maximum (${MAX_AMOUNT:,}): {self.amount}")
-        if self.frequency not in ("weekly", "monthly"):
-            raise ValueError(f"Frequency must be 'weekly' or 'monthly': {self.frequency}")
+
+class Expense(_ExpenseFields):
+    """Represents a budget expense (fixed or variable)."""
+    __slots__ = ()
+
+    def __new__(cls, name: str, amount: float, is_fixed: bool, frequency: str = "monthly"):
+        if amount < 0:
+            raise ValueError(f"Expense amount cannot be negative: {amount}")
+        if amount > MAX_AMOUNT:
+            raise ValueError(f"Expense amount exceeds maximum (${MAX_AMOUNT:,}): {amount}")
+        if frequency not in ("weekly", "monthly"):
+            raise ValueError(f"Frequency must be 'weekly' or 'monthly': {frequency}")
+        return super().__new__(cls, name, amount, is_fixed, frequency)
 
     @property
     def monthly_amount(self) -> float:
@@ -43,19 +46,24 @@ class Expense:
         return self.amount
 
 
-@dataclass
-class Transaction:
-    """Represents a daily spending transaction."""
+class _TransactionFields(NamedTuple):
     date: datetime
     amount: float
     description: str
     category: Optional[str] = None
 
-    def __post_init__(self):
-        if self.amount < 0:
-            raise ValueError(f"Transaction amount cannot be negative: {self.amount}")
-        if self.amount > MAX_AMOUNT:
-            raise ValueError(f"Transaction amount exceeds maximum (${MAX_AMOUNT:,}): {self.amount}")
+
+class Transaction(_TransactionFields):
+    """Represents a daily spending transaction."""
+    __slots__ = ()
+
+    def __new__(cls, date: datetime, amount: float, description: str,
+                category: Optional[str] = None):
+        if amount < 0:
+            raise ValueError(f"Transaction amount cannot be negative: {amount}")
+        if amount > MAX_AMOUNT:
+            raise ValueError(f"Transaction amount exceeds maximum (${MAX_AMOUNT:,}): {amount}")
+        return super().__new__(cls, date, amount, description, category)
 
 
 class BudgetCalculator:
@@ -71,6 +79,38 @@ class BudgetCalculator:
         expense = Expense(name=name, amount=amount, is_fixed=is_fixed, frequency=frequency)
         self.expenses.append(expense)
 
+    @staticmethod
+    def _expenses_from_rows(rows: Iterable[Dict[str, Any]]) -> List[Expense]:
+        """Build Expense records from database-style dicts."""
+        return [
+            Expense(
+                name=row["name"],
+                amount=row["amount"],
+                is_fixed=row.get("is_fixed", True),
+                frequency=row.get("frequency", "monthly")
+            )
+            for row in rows
+        ]
+
+    def add_expenses_bulk(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """
+        Add many budget expenses at once (e.g. rows loaded from the database).
+
+        Each row needs name and amount, with optional is_fixed and frequency;
+        other keys such as id or timestamps are ignored. All rows are validated
+        before any is added, so a bad row leaves the expense list unchanged.
+        """
+        self.expenses.extend(self._expenses_from_rows(rows))
+
+    def set_expenses(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """
+        Replace all budget expenses with the given rows.
+
+        Takes the same rows as add_expenses_bulk. The list is swapped only
+        after every row validates, so a bad row keeps the current expenses.
+        """
+        self.expenses = self._expenses_from_rows(rows)
+
     def add_transaction(self, amount: float, description: str,
                        date: Optional[datetime] = None, category: Optional[str] = None) -> None:
         """Record a spending transaction."""
@@ -79,6 +119,46 @@ class BudgetCalculator:
         transaction = Transaction(date=date, amount=amount, description=description, category=category)
         self.transactions.append(transaction)
 
+    def add_transactions_bulk(self, amounts: Sequence[float], descriptions: Sequence[str],
+                              dates: Optional[Sequence[datetime]] = None,
+                              categories: Optional[Sequence[Optional[str]]] = None) -> None:
+        """
+        Record many spending transactions at once (e.g. a CSV import).
+
+        Amounts are range-checked in a single pass before anything is appended,
+        so a bad row rejects the whole batch instead of leaving a partial import.
+
+        Args:
+            amounts: Transaction amounts
+            descriptions: Transaction descriptions (same length as amounts)
+            dates: Optional transaction dates (defaults to now for every row)
+            categories: Optional categories (defaults to None for every row)
+        """
+        count = len(amounts)
+        if len(descriptions) != count:
+            raise ValueError("amounts and descriptions must be the same length")
+        if dates is not None and len(dates) != count:
+            raise ValueError("amounts and dates must be the same length")
+        if categories is not None and len(categories) != count:
+            raise ValueError("amounts and categories must be the same length")
+        if not count:
+            return
+
+        if min(amounts) < 0:
+            raise ValueError(f"Transaction amount cannot be negative: {min(amounts)}")
+        if max(amounts) > MAX_AMOUNT:
+            raise ValueError(f"Transaction amount exceeds maximum (${MAX_AMOUNT:,}): {max(amounts)}")
+
+        if dates is None:
+            dates = [datetime.now()] * count
+        if categories is None:
+            categories = [None] * count
+
+        self.transactions.extend(
+            Transaction(date=date, amount=amount, description=description, category=category)
+            for amount, description, date, category in zip(amounts, descriptions, dates, categories)
+        )
+
     def get_total_expenses(self) -> float:
         """Calculate total monthly expenses (normalizes weekly to monthly)."""
         return sum(expense.monthly_amount for expense in self.expenses)
@@ -166,7 +246,9 @@ class BudgetCalculator:
             daily_spending_limit: Optional daily spending limit to enforce (Option C)
 
         Returns:
-            Dictionary with budget calculations for both options
+            Dictionary with budget calculations for both options. Durations that
+            depend on expenses (days/months remaining, alt_days_remaining) are None
+            when there are no expenses, i.e. the money lasts indefinitely.
         """
         if total_money < 0:
             raise ValueError("Total money cannot be negative")
@@ -213,7 +295,7 @@ class BudgetCalculator:
                 days_if_spending_expenses = total_money / daily_expense_rate
                 end_date_option_c = today + timedelta(days=days_if_spending_expenses)
             else:
-                days_if_spending_expenses = float('inf')
+                days_if_spending_expenses = None
                 end_date_option_c = None
 
             return {
@@ -246,7 +328,7 @@ class BudgetCalculator:
                 days_based_on_expenses = total_money / daily_expense_rate
                 alt_daily_limit = total_money / days_based_on_expenses if days_based_on_expenses > 0 else 0
             else:
-                days_based_on_expenses = float('inf')
+                days_based_on_expenses = None
                 alt_daily_limit = 0
 
             return {
@@ -271,8 +353,8 @@ class BudgetCalculator:
                 daily_limit = total_money / days_remaining if days_remaining > 0 else 0
                 end_date = today + timedelta(days=days_remaining)
             else:
-                months_remaining = float('inf')
-                days_remaining = float('inf')
+                months_remaining = None
+                days_remaining = None
                 daily_limit = 0
                 end_date = None
 
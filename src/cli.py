@@ -5,49 +5,205 @@ Provides an interactive CLI for managing budget, expenses, and getting daily spe
 """
 
 import os
+import re
 import sys
-from datetime import datetime
-from typing import Optional
-from pathlib import Path
+from functools import cached_property
+from math import fsum
+from operator import itemgetter
+from typing import TYPE_CHECKING, List, Optional, Sequence
 
-from .database import EncryptedDatabase
 from .calculator import BudgetCalculator, Expense
-from .onboarding import Onboarding
+from .utils import clear_screen
+
+if TYPE_CHECKING:
+    from .database import EncryptedDatabase
+
+# The CLI is single-user; its data belongs to this account in the database
+_LOCAL_USERNAME = "local"
+
+# Settings read by get_the_number and the onboarding check; fetched together in one query
+_BUDGET_SETTING_KEYS = ["budget_mode", "monthly_income", "days_until_paycheck", "total_money", "onboarded"]
+
+# Values used for budget settings that haven't been stored yet
+_BUDGET_SETTING_DEFAULTS = {
+    "budget_mode": None,
+    "monthly_income": 0,
+    "days_until_paycheck": 30,
+    "total_money": 0,
+    "onboarded": False,
+}
+
+# Accepted spellings for numeric prompts, checked before conversion
+_NUMBER_PATTERNS = {
+    int: re.compile(r"[+-]?\d+"),
+    float: re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"),
+}
+
+# Menu options, in display order
+_MAIN_MENU = (
+    "🎯 Get The Number (Daily Budget)",
+    "💵 Record Spending",
+    "📊 Manage Expenses",
+    "📝 View Transactions",
+    "⚙️  Setup Budget Mode",
+    "❌ Exit",
+)
+_MANAGE_EXPENSES_MENU = (
+    "Add Expense",
+    "Import from CSV/Excel",
+    "Export to CSV/Excel",
+    "Remove Expense",
+    "Back to Main Menu",
+)
+_BUDGET_MODE_MENU = (
+    "Paycheck Mode (Regular income, calculate days until paycheck)",
+    "Fixed Pool Mode (Fixed amount of money, calculate how long it lasts)",
+    "Back to Main Menu",
+)
+
+# Rules drawn above/below screen titles and between sections
+_BAR = "=" * 60
+_RULE = "-" * 60
+
+# Fields shown for each row of the manage-expenses list
+_EXPENSE_COLUMNS = itemgetter("id", "name", "amount", "is_fixed")
+
+# Fields and row layout for the recent-transactions list
+_TRANSACTION_COLUMNS = itemgetter("date", "amount", "description", "category")
+_transaction_row = "    {}  ${:>8.2f}  {}{}".format
+
+# Bound once so renders don't re-parse the currency format spec
+_dollars = "${:.2f}".format
+
+# Indexed by spending state: within budget, over the limit, close to the limit
+_SPENDING_WARNINGS = (
+    "",
+    "\n  ⚠️  Warning: You've exceeded your daily limit!",
+    "\n  ⚠️  Warning: You're close to your daily limit!",
+)
+
+# Answers accepted as "yes" at y/n prompts
+_YES = frozenset({"y", "yes", "true", "1"})
+
+_USAGE = """usage: python -m src.cli [--help] [--version]
+
+The Number - see how much you can spend today.
+
+options:
+  -h, --help     show this help message and exit
+  --version      show the app version and exit
+
+Set DB_ENCRYPTION_KEY to open an existing budget database."""
+
+# os.path rather than pathlib: pathlib is the slowest import on the --version path
+_VERSION_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "VERSION")
 
 
 class CLI:
     """Interactive command-line interface for The Number app."""
 
     def __init__(self, db_path: str = "budget.db"):
-        """Initialize CLI with database connection."""
+        """Initialize CLI; the database is opened on first use."""
+        self._db_path = db_path
+        # Set once onboarding has been checked and expenses are loaded
+        self._ready = False
+        self.calculator = BudgetCalculator()
+        self._budget_settings: Optional[dict] = None
+        # Bumped whenever expenses or budget settings change; keys _result_cache
+        self._state_version = 0
+        self._result_cache: dict = {}
+        # Today's net spending and the (user-timezone) day it was fetched for
+        self._today_total = 0.0
+        self._today_date = None
+        # Expense rows as shown by manage_expenses, and their total; None = stale
+        self._expenses_cache: Optional[list] = None
+        self._expenses_total = 0.0
+        # Only wait for Enter when a person is at the terminal
+        self._interactive = sys.stdin.isatty()
+
+    @cached_property
+    def db(self) -> "EncryptedDatabase":
+        """Encrypted database, opened the first time it is needed."""
+        # Imported here so --help/--version never load the crypto stack
+        from .database import EncryptedDatabase
+
         # Load encryption key from environment
         encryption_key = os.getenv("DB_ENCRYPTION_KEY")
 
-        self.db = EncryptedDatabase(db_path=db_path, encryption_key=encryption_key)
-        self.calculator = BudgetCalculator()
+        return EncryptedDatabase(db_path=self._db_path, encryption_key=encryption_key)
+
+    @cached_property
+    def user_id(self) -> int:
+        """ID of the local account the CLI reads and writes as, created on first use."""
+        user = self.db.get_user_by_username(_LOCAL_USERNAME)
+        if user:
+            return user["id"]
+        # On a database from before accounts existed this is user 1, which
+        # already owns its data
+        return self.db.create_user(_LOCAL_USERNAME, password_hash="")
+
+    def _ensure_ready(self) -> None:
+        """Load expenses and run onboarding if needed, the first time data is used."""
+        if self._ready:
+            return
         self._load_expenses()
         self._check_onboarding()
+        self._ready = True
+
+    @classmethod
+    def bootstrap(cls, argv: Optional[List[str]] = None) -> Optional["CLI"]:
+        """
+        Answer info-only flags before any database setup.
+
+        Args:
+            argv: Command-line arguments (defaults to sys.argv[1:])
+
+        Returns:
+            A ready CLI, or None if the invocation was fully handled
+        """
+        args = sys.argv[1:] if argv is None else argv
+
+        if "-h" in args or "--help" in args:
+            print(_USAGE)
+            return None
+        if "--version" in args:
+            try:
+                with open(_VERSION_FILE) as f:
+                    version = f.read().strip()
+            except OSError:
+                version = "unknown"
+            print(f"The Number {version}")
+            return None
+
+        return cls()
 
     def _load_expenses(self) -> None:
-        """Load expenses from database into calculator."""
-        expenses = self.db.get_expenses()
-        for exp in expenses:
-            self.calculator.add_expense(
-                name=exp["name"],
-                amount=exp["amount"],
-                is_fixed=exp["is_fixed"]
-            )
+        """Load expenses from database into calculator and the expense list cache."""
+        self._expenses_cache, self._expenses_total = self.db.get_expense_summary(self.user_id)
+        self.calculator.set_expenses(self._expenses_cache)
+
+    def _get_expense_summary(self) -> tuple:
+        """Return (expense rows, total), querying the database only after a change."""
+        if self._expenses_cache is None:
+            self._expenses_cache, self._expenses_total = self.db.get_expense_summary(self.user_id)
+        return self._expenses_cache, self._expenses_total
 
     def _check_onboarding(self) -> None:
         """Check if user needs to go through onboarding."""
-        if not self.db.get_setting("onboarded"):
-            onboarding = Onboarding(self.db)
+        # Served from the settings memo, so this adds no query of its own
+        if not self._get_budget_settings()["onboarded"]:
+            from .onboarding import Onboarding
+
+            onboarding = Onboarding(self.db, self.user_id)
             success = onboarding.run()
 
             if success:
-                # Reload expenses after onboarding
-                self.calculator.expenses = []
-                self._load_expenses()
+                # Add only the expenses onboarding just saved
+                self.calculator.add_expenses_bulk(onboarding.saved_expenses)
+                self._expenses_cache = None
+                # Onboarding stored the budget settings; re-read them on next use
+                self._budget_settings = None
+                self._state_changed()
             else:
                 # User cancelled onboarding
                 self.clear_screen()
@@ -55,23 +211,103 @@ class CLI:
                 sys.exit(0)
 
 
+    def _get_budget_settings(self) -> dict:
+        """Return budget settings, fetching them in a single query on first use."""
+        if self._budget_settings is None:
+            # Fill in defaults once here so readers can index the dict directly
+            self._budget_settings = {
+                **_BUDGET_SETTING_DEFAULTS,
+                **self.db.get_settings_bulk(_BUDGET_SETTING_KEYS, self.user_id)
+            }
+        return self._budget_settings
+
+    def _state_changed(self) -> None:
+        """Invalidate cached calculator results after expenses or settings change."""
+        self._state_version += 1
+        self._result_cache.clear()
+
+    def _calculate(self, budget_mode: str, settings: dict) -> dict:
+        """Run the calculator for the current mode, reusing the last result until state changes."""
+        # Inputs are part of the key so a result can never outlive the settings it used
+        key = (
+            budget_mode,
+            settings["monthly_income"],
+            settings["days_until_paycheck"],
+            settings["total_money"],
+            self._state_version,
+        )
+        result = self._result_cache.get(key)
+        if result is None:
+            if budget_mode == "paycheck":
+                result = self.calculator.calculate_paycheck_mode(
+                    monthly_income=settings["monthly_income"],
+                    days_until_paycheck=settings["days_until_paycheck"]
+                )
+            else:
+                result = self.calculator.calculate_fixed_pool_mode(
+                    total_money=settings["total_money"]
+                )
+            self._result_cache[key] = result
+        return result
+
+    def _get_today_spending(self) -> float:
+        """Return today's net spending, querying the database only once per day."""
+        from api.utils.dates import get_user_today
+
+        today = get_user_today()
+        if self._today_date != today:
+            self._today_total = self.db.get_total_spending_today(self.user_id)
+            self._today_date = today
+        return self._today_total
+
     def clear_screen(self) -> None:
         """Clear the terminal screen."""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        clear_screen()
+
+    def _pause(self, message: Optional[str] = None) -> None:
+        """
+        Wait for Enter before leaving a screen; skipped when stdin is piped.
+
+        Args:
+            message: Closing text to print first, written together with the prompt
+        """
+        text = "" if message is None else message + "\n"
+        if self._interactive:
+            sys.stdout.write(text + "  Press Enter to continue...")
+            sys.stdout.flush()
+            sys.stdin.readline()
+        elif text:
+            sys.stdout.write(text)
 
     def print_header(self, title: str) -> None:
         """Print a formatted header."""
-        print("\n" + "="*60)
-        print(f"  {title}")
-        print("="*60 + "\n")
+        print(f"\n{_BAR}\n  {title}\n{_BAR}\n")
 
-    def print_menu(self, options: list) -> None:
+    def print_menu(self, options: Sequence[str]) -> None:
         """Print a numbered menu."""
-        for i, option in enumerate(options, 1):
-            print(f"  {i}. {option}")
-        print()
+        print("".join(f"  {i}. {option}\n" for i, option in enumerate(options, 1)))
+
+    def _latest_pending_line(self, line: str) -> str:
+        """
+        Return the last line already waiting on stdin, or line if none is.
 
-    def get_input(self, prompt: str, input_type: type = str, allow_empty: bool = False) -> any:
+        Lets a menu act once on a burst of held-key or pasted answers instead
+        of redrawing for each. Only used on interactive POSIX terminals; lines
+        already pulled into Python's input buffer are left for later prompts.
+        """
+        if not self._interactive or os.name == 'nt':
+            return line
+        import select
+
+        while select.select([sys.stdin], [], [], 0)[0]:
+            pending = sys.stdin.readline()
+            if not pending:
+                break
+            line = pending.rstrip("\n")
+        return line
+
+    def get_input(self, prompt: str, input_type: type = str, allow_empty: bool = False,
+                  coalesce: bool = False) -> any:
         """
         Get validated user input.
 
@@ -79,13 +315,21 @@ class CLI:
             prompt: Input prompt to display
             input_type: Type to convert input to (str, int, float)
             allow_empty: Whether to allow empty input
+            coalesce: Use only the newest of several lines typed ahead (menus)
 
         Returns:
             Validated input of specified type
         """
+        prompt_text = f"  {prompt}: "
+        invalid_message = f"  ❌ Invalid input. Please enter a valid {input_type.__name__}.\n"
+        number_pattern = _NUMBER_PATTERNS.get(input_type)
+
         while True:
             try:
-                value = input(f"  {prompt}: ").strip()
+                value = input(prompt_text)
+                if coalesce:
+                    value = self._latest_pending_line(value)
+                value = value.strip()
 
                 if not value and allow_empty:
                     return None
@@ -94,17 +338,15 @@ class CLI:
                     print("  ❌ Input cannot be empty. Please try again.\n")
                     continue
 
-                if input_type == str:
-                    return value
-                elif input_type == int:
-                    return int(value)
-                elif input_type == float:
-                    return float(value)
-                else:
-                    return input_type(value)
+                # Reject non-numeric text up front (this also keeps out "inf"/"nan")
+                if number_pattern is not None and not number_pattern.fullmatch(value):
+                    print(invalid_message)
+                    continue
+
+                return input_type(value)
 
             except ValueError:
-                print(f"  ❌ Invalid input. Please enter a valid {input_type.__name__}.\n")
+                print(invalid_message)
             except KeyboardInterrupt:
                 print("\n\n  Cancelled.\n")
                 return None
@@ -115,57 +357,72 @@ class CLI:
         self.print_header("GET THE NUMBER")
 
         # Check if user has set up their budget mode
-        budget_mode = self.db.get_setting("budget_mode")
+        settings = self._get_budget_settings()
+        budget_mode = settings["budget_mode"]
 
         if not budget_mode:
             print("  You haven't set up your budget mode yet.")
-            print("  Please configure your budget first (Setup > Budget Mode).\n")
-            input("  Press Enter to continue...")
+            self._pause("  Please configure your budget first (Setup > Budget Mode).\n")
             return
 
-        if budget_mode == "paycheck":
-            monthly_income = self.db.get_setting("monthly_income", 0)
-            days_until_paycheck = self.db.get_setting("days_until_paycheck", 30)
-
-            result = self.calculator.calculate_paycheck_mode(
-                monthly_income=monthly_income,
-                days_until_paycheck=days_until_paycheck
-            )
-
-            print(f"  💰 Monthly Income: ${result['total_income']:.2f}")
-            print(f"  📊 Total Expenses: ${result['total_expenses']:.2f}")
-            print(f"  💵 Remaining: ${result['remaining_money']:.2f}")
-            print(f"  📅 Days Until Paycheck: {result['days_remaining']}")
-            print("\n" + "-"*60 + "\n")
-            print(f"  🎯 THE NUMBER: ${result['daily_limit']:.2f} per day")
-            print("\n" + "-"*60 + "\n")
-
-        elif budget_mode == "fixed_pool":
-            total_money = self.db.get_setting("total_money", 0)
-
-            result = self.calculator.calculate_fixed_pool_mode(total_money=total_money)
-
-            print(f"  💰 Total Money: ${result['total_money']:.2f}")
-            print(f"  📊 Monthly Expenses: ${result['monthly_expenses']:.2f}")
-            print(f"  📅 Money Will Last: {result['days_remaining']:.1f} days ({result['months_remaining']:.1f} months)")
-            print("\n" + "-"*60 + "\n")
-            print(f"  🎯 THE NUMBER: ${result['daily_limit']:.2f} per day")
-            print("\n" + "-"*60 + "\n")
+        result = self._calculate(budget_mode, settings)
+
+        # Build the screen up front and write it once
+        render = self._MODE_RENDERERS.get(budget_mode)
+        lines = []
+        if render is not None:
+            lines += render(result)
+            lines += [
+                f"\n{_RULE}\n",
+                f"  🎯 THE NUMBER: {_dollars(result['daily_limit'])} per day",
+                f"\n{_RULE}\n",
+            ]
 
         # Show today's spending
-        today_spending = self.db.get_total_spending_today()
+        today_spending = self._get_today_spending()
         remaining_today = result['daily_limit'] - today_spending
 
-        print(f"  Today's Spending: ${today_spending:.2f}")
-        print(f"  Remaining Today: ${remaining_today:.2f}")
+        lines.append(f"  Today's Spending: {_dollars(today_spending)}")
+        lines.append(f"  Remaining Today: {_dollars(remaining_today)}")
+
+        warning_threshold = result['daily_limit'] * 0.2
+        warning = _SPENDING_WARNINGS[
+            1 if remaining_today < 0 else (2 if remaining_today < warning_threshold else 0)
+        ]
+        if warning:
+            lines.append(warning)
+
+        lines.append("")
+        self._pause("\n".join(lines))
+
+    @staticmethod
+    def _render_paycheck(result: dict) -> list:
+        """Summary lines for a paycheck-mode result."""
+        return [
+            f"  💰 Monthly Income: {_dollars(result['total_income'])}",
+            f"  📊 Total Expenses: {_dollars(result['total_expenses'])}",
+            f"  💵 Remaining: {_dollars(result['remaining_money'])}",
+            f"  📅 Days Until Paycheck: {result['days_remaining']}",
+        ]
 
-        if remaining_today < 0:
-            print("\n  ⚠️  Warning: You've exceeded your daily limit!")
-        elif remaining_today < result['daily_limit'] * 0.2:
-            print("\n  ⚠️  Warning: You're close to your daily limit!")
+    @staticmethod
+    def _render_fixed_pool(result: dict) -> list:
+        """Summary lines for a fixed-pool-mode result."""
+        lines = [
+            f"  💰 Total Money: {_dollars(result['total_money'])}",
+            f"  📊 Monthly Expenses: {_dollars(result['total_expenses'])}",
+        ]
+        if result['days_remaining'] is None:
+            lines.append("  📅 Money Will Last: Indefinitely")
+        else:
+            lines.append(f"  📅 Money Will Last: {result['days_remaining']:.1f} days ({result['months_remaining']:.1f} months)")
+        return lines
 
-        print()
-        input("  Press Enter to continue...")
+    # Summary renderer for each budget mode, looked up once per render
+    _MODE_RENDERERS = {
+        "paycheck": _render_paycheck,
+        "fixed_pool": _render_fixed_pool,
+    }
 
     def manage_expenses(self) -> None:
         """Manage budget expenses."""
@@ -173,28 +430,22 @@ class CLI:
             self.clear_screen()
             self.print_header("MANAGE EXPENSES")
 
-            expenses = self.db.get_expenses()
-            total = sum(exp["amount"] for exp in expenses)
+            expenses, total = self._get_expense_summary()
 
             if expenses:
-                print("  Current Expenses:\n")
-                for exp in expenses:
-                    expense_type = "Fixed" if exp["is_fixed"] else "Variable"
-                    print(f"    [{exp['id']}] {exp['name']:<20} ${exp['amount']:>8.2f}  ({expense_type})")
-                print(f"\n  {'Total:':<22} ${total:>8.2f}\n")
+                lines = ["  Current Expenses:\n"]
+                # Pull the four displayed fields per row in one C-level lookup
+                for exp_id, name, amount, is_fixed in map(_EXPENSE_COLUMNS, expenses):
+                    expense_type = "Fixed" if is_fixed else "Variable"
+                    lines.append(f"    [{exp_id}] {name:<20} ${amount:>8.2f}  ({expense_type})")
+                lines.append(f"\n  {'Total:':<22} ${total:>8.2f}\n")
+                print("\n".join(lines))
             else:
                 print("  No expenses added yet.\n")
 
-            options = [
-                "Add Expense",
-                "Import from CSV/Excel",
-                "Export to CSV/Excel",
-                "Remove Expense",
-                "Back to Main Menu"
-            ]
-            self.print_menu(options)
+            self.print_menu(_MANAGE_EXPENSES_MENU)
 
-            choice = self.get_input("Select option", int)
+            choice = self.get_input("Select option", int, coalesce=True)
 
             if choice == 1:
                 self._add_expense()
@@ -221,16 +472,17 @@ class CLI:
             return
 
         is_fixed_input = self.get_input("Is this a fixed monthly expense? (y/n)", str)
-        is_fixed = is_fixed_input.lower() in ['y', 'yes']
+        is_fixed = is_fixed_input.lower() in _YES
 
         # Add to database
-        self.db.add_expense(name=name, amount=amount, is_fixed=is_fixed)
+        self.db.add_expense(name=name, amount=amount, user_id=self.user_id, is_fixed=is_fixed)
 
-        # Add to calculator
+        # Add to calculator; the expense list is re-read for its new id and timestamp
         self.calculator.add_expense(name=name, amount=amount, is_fixed=is_fixed)
+        self._expenses_cache = None
+        self._state_changed()
 
-        print(f"\n  ✅ Added expense: {name} - ${amount:.2f}\n")
-        input("  Press Enter to continue...")
+        self._pause(f"\n  ✅ Added expense: {name} - ${amount:.2f}\n")
 
     def _import_expenses(self) -> None:
         """Import expenses from CSV or Excel file."""
@@ -248,14 +500,14 @@ class CLI:
         print("    name,amount,is_fixed")
         print("    Rent,1500,yes")
         print("    Groceries,300,no\n")
-        print("-"*60 + "\n")
+        print(_RULE + "\n")
 
         # Option to create sample file
         create_sample = self.get_input(
             "Create a sample CSV file for reference? (y/n)",
             str
         )
-        if create_sample and create_sample.lower() in ['y', 'yes']:
+        if create_sample and create_sample.lower() in _YES:
             create_sample_csv("sample_expenses.csv")
             print(f"\n  Created: sample_expenses.csv")
             print("  You can edit this file and import it.\n")
@@ -284,8 +536,7 @@ class CLI:
             print()
 
             if not expenses:
-                print("  Import failed. No valid expenses found.\n")
-                input("  Press Enter to continue...")
+                self._pause("  Import failed. No valid expenses found.\n")
                 return
 
         # Validate expenses
@@ -297,18 +548,11 @@ class CLI:
             print()
 
         if not expenses:
-            print("  No expenses to import.\n")
-            input("  Press Enter to continue...")
+            self._pause("  No expenses to import.\n")
             return
 
-        # Show preview
-        print("  Preview of expenses to import:\n")
-        total = sum(exp['amount'] for exp in expenses)
-        for exp in expenses:
-            exp_type = "Fixed" if exp['is_fixed'] else "Variable"
-            print(f"    {exp['name']:<30} ${exp['amount']:>8,.2f}  ({exp_type})")
-        print(f"\n  Total: ${total:,.2f}")
-        print(f"  Count: {len(expenses)} expenses\n")
+        # Show preview (the total is summed while the rows are formatted)
+        self._print_expense_preview("Preview of expenses to import:", expenses)
 
         # Confirm import
         confirm = self.get_input(
@@ -316,9 +560,8 @@ class CLI:
             str
         )
 
-        if confirm and confirm.lower() not in ['y', 'yes']:
-            print("\n  Import cancelled.\n")
-            input("  Press Enter to continue...")
+        if confirm and confirm.lower() not in _YES:
+            self._pause("\n  Import cancelled.\n")
             return
 
         # Ask if should replace or add
@@ -332,34 +575,40 @@ class CLI:
             int
         )
 
-        # Clear existing if replace mode
+        # Import expenses in one transaction, clearing existing ones first in replace mode
+        imported_count, import_errors = self.db.bulk_add_expenses(
+            expenses, self.user_id, replace=(mode == 2)
+        )
         if mode == 2:
-            existing = self.db.get_expenses()
-            for exp in existing:
-                self.db.delete_expense(exp['id'])
             print("\n  Cleared existing expenses.")
-
-        # Import expenses
-        imported_count = 0
-        for exp in expenses:
-            try:
-                self.db.add_expense(
-                    name=exp['name'],
-                    amount=exp['amount'],
-                    is_fixed=exp['is_fixed']
-                )
-                imported_count += 1
-            except Exception as e:
-                print(f"  Error importing {exp['name']}: {e}")
+        for error in import_errors:
+            print(f"  {error}")
 
         # Reload expenses in calculator
-        self.calculator.expenses = []
         self._load_expenses()
+        self._state_changed()
 
-        print(f"\n  Successfully imported {imported_count} expenses!\n")
-        input("  Press Enter to continue...")
+        self._pause(f"\n  Successfully imported {imported_count} expenses!\n")
 
 
+    def _print_expense_preview(self, title: str, expenses: list,
+                               total: Optional[float] = None) -> None:
+        """
+        Print an expense list with its total and count in a single write.
+
+        If total is not given it is summed in the same pass that formats the rows.
+        """
+        lines = [f"  {title}\n"]
+        running_total = 0.0
+        for name, amount, is_fixed in map(itemgetter("name", "amount", "is_fixed"), expenses):
+            running_total += amount
+            lines.append(f"    {name:<30} ${amount:>8,.2f}  ({'Fixed' if is_fixed else 'Variable'})")
+        if total is None:
+            total = running_total
+        lines.append(f"\n  Total: ${total:,.2f}")
+        lines.append(f"  Count: {len(expenses)} expenses\n")
+        print("\n".join(lines))
+
     def _export_expenses(self) -> None:
         """Export expenses to CSV or Excel file."""
         from .export_expenses import export_to_csv, export_to_excel, export_budget_summary
@@ -367,22 +616,15 @@ class CLI:
         self.clear_screen()
         self.print_header("EXPORT BUDGET DATA")
 
-        expenses = self.db.get_expenses()
+        expenses, total = self._get_expense_summary()
 
         if not expenses:
-            print("  No expenses to export.\n")
-            input("  Press Enter to continue...")
+            self._pause("  No expenses to export.\n")
             return
 
         # Show preview
-        total = sum(exp["amount"] for exp in expenses)
-        print("  Current Expenses:\n")
-        for exp in expenses:
-            exp_type = "Fixed" if exp["is_fixed"] else "Variable"
-            print(f"    {exp['name']:<30} ${exp['amount']:>8,.2f}  ({exp_type})")
-        print(f"\n  Total: ${total:,.2f}")
-        print(f"  Count: {len(expenses)} expenses\n")
-        print("-"*60 + "\n")
+        self._print_expense_preview("Current Expenses:", expenses, total)
+        print(_RULE + "\n")
 
         # Choose export type
         print("  Export Options:\n")
@@ -397,8 +639,7 @@ class CLI:
         )
 
         if export_choice is None or export_choice not in [1, 2, 3, 4]:
-            print("\n  Export cancelled.\n")
-            input("  Press Enter to continue...")
+            self._pause("\n  Export cancelled.\n")
             return
 
         try:
@@ -412,22 +653,12 @@ class CLI:
                 export_type = "Excel"
             elif export_choice == 3:
                 # CSV full summary
-                settings = {
-                    'budget_mode': self.db.get_setting('budget_mode'),
-                    'monthly_income': self.db.get_setting('monthly_income'),
-                    'days_until_paycheck': self.db.get_setting('days_until_paycheck'),
-                    'total_money': self.db.get_setting('total_money')
-                }
+                settings = dict(self._get_budget_settings())
                 output_path = export_budget_summary(expenses, settings, format='csv')
                 export_type = "CSV summary"
             else:
                 # Excel full summary
-                settings = {
-                    'budget_mode': self.db.get_setting('budget_mode'),
-                    'monthly_income': self.db.get_setting('monthly_income'),
-                    'days_until_paycheck': self.db.get_setting('days_until_paycheck'),
-                    'total_money': self.db.get_setting('total_money')
-                }
+                settings = dict(self._get_budget_settings())
                 output_path = export_budget_summary(expenses, settings, format='excel')
                 export_type = "Excel summary"
 
@@ -442,29 +673,45 @@ class CLI:
         except Exception as e:
             print(f"\n  Export failed: {e}\n")
 
-        input("  Press Enter to continue...")
+        self._pause()
 
 
     def _remove_expense(self) -> None:
         """Remove an expense."""
-        expenses = self.db.get_expenses()
+        expenses, _ = self._get_expense_summary()
         if not expenses:
-            print("\n  No expenses to remove.\n")
-            input("  Press Enter to continue...")
+            self._pause("\n  No expenses to remove.\n")
             return
 
         print("\n  Remove Expense\n")
         expense_id = self.get_input("Enter expense ID to remove", int)
 
         if expense_id:
-            self.db.delete_expense(expense_id)
-            print(f"\n  ✅ Removed expense ID {expense_id}\n")
-
-            # Reload expenses into calculator
-            self.calculator.expenses = []
-            self._load_expenses()
-
-        input("  Press Enter to continue...")
+            removed = next((exp for exp in expenses if exp["id"] == expense_id), None)
+            if removed is None:
+                print(f"\n  ❌ No expense with ID {expense_id}\n")
+            else:
+                self.db.delete_expense(expense_id, self.user_id)
+                print(f"\n  ✅ Removed expense ID {expense_id}\n")
+
+                # Update the cached list in place; re-sum it rather than subtracting
+                # so repeated removals don't accumulate float error
+                expenses.remove(removed)
+                self._expenses_total = fsum(map(itemgetter("amount"), expenses))
+
+                # Drop the matching entry from the calculator instead of reloading all
+                try:
+                    self.calculator.expenses.remove(
+                        Expense(name=removed["name"], amount=removed["amount"],
+                                is_fixed=removed["is_fixed"], frequency=removed["frequency"])
+                    )
+                except ValueError:
+                    # Calculator copy drifted from the database (e.g. sanitized name);
+                    # resync from the cached rows, which already reflect the removal
+                    self.calculator.set_expenses(expenses)
+                self._state_changed()
+
+        self._pause()
 
     def record_spending(self) -> None:
         """Record a spending transaction."""
@@ -473,8 +720,7 @@ class CLI:
 
         amount = self.get_input("Amount spent", float)
         if amount is None or amount < 0:
-            print("  ❌ Amount must be a positive number.")
-            input("  Press Enter to continue...")
+            self._pause("  ❌ Amount must be a positive number.")
             return
 
         description = self.get_input("Description")
@@ -484,45 +730,48 @@ class CLI:
         category = self.get_input("Category (optional)", str, allow_empty=True)
 
         # Add transaction
-        self.db.add_transaction(amount=amount, description=description, category=category)
+        self.db.add_transaction(amount=amount, description=description, user_id=self.user_id,
+                                 category=category)
         self.calculator.add_transaction(amount=amount, description=description, category=category)
+        # Keep the cached daily total in step (income offsets spending)
+        if self._today_date is not None:
+            self._today_total += -amount if category == "income" else amount
 
-        print(f"\n  ✅ Recorded: ${amount:.2f} - {description}\n")
-        input("  Press Enter to continue...")
+        self._pause(f"\n  ✅ Recorded: ${amount:.2f} - {description}\n")
 
     def view_transactions(self) -> None:
         """View recent transactions."""
         self.clear_screen()
         self.print_header("RECENT TRANSACTIONS")
 
-        transactions = self.db.get_transactions(limit=20)
+        transactions = self.db.get_transactions(self.user_id, limit=20)
 
         if transactions:
-            print("  Last 20 Transactions:\n")
-            for txn in transactions:
-                date_str = datetime.fromisoformat(txn["date"]).strftime("%Y-%m-%d %H:%M")
-                category = f" [{txn['category']}]" if txn['category'] else ""
-                print(f"    {date_str}  ${txn['amount']:>8.2f}  {txn['description']}{category}")
-            print()
+            lines = ["  Last 20 Transactions:\n"]
+            for date, amount, description, category in map(_TRANSACTION_COLUMNS, transactions):
+                # Stored dates are UTC ISO 8601, so "YYYY-MM-DDTHH:MM" is the first 16 chars
+                lines.append(_transaction_row(
+                    date[:16].replace("T", " "),
+                    amount,
+                    description,
+                    f" [{category}]" if category else ""
+                ))
+            lines.append("")
+            print("\n".join(lines))
         else:
             print("  No transactions recorded yet.\n")
 
-        input("  Press Enter to continue...")
+        self._pause()
 
     def setup_budget_mode(self) -> None:
         """Configure budget mode and settings."""
         self.clear_screen()
         self.print_header("BUDGET MODE SETUP")
 
-        current_mode = self.db.get_setting("budget_mode", "Not set")
+        current_mode = self._get_budget_settings()["budget_mode"] or "Not set"
         print(f"  Current Mode: {current_mode}\n")
 
-        options = [
-            "Paycheck Mode (Regular income, calculate days until paycheck)",
-            "Fixed Pool Mode (Fixed amount of money, calculate how long it lasts)",
-            "Back to Main Menu"
-        ]
-        self.print_menu(options)
+        self.print_menu(_BUDGET_MODE_MENU)
 
         choice = self.get_input("Select budget mode", int)
 
@@ -543,12 +792,15 @@ class CLI:
         if days_until_paycheck is None or days_until_paycheck <= 0:
             return
 
-        self.db.set_setting("budget_mode", "paycheck")
-        self.db.set_setting("monthly_income", monthly_income)
-        self.db.set_setting("days_until_paycheck", days_until_paycheck)
+        self.db.set_settings({
+            "budget_mode": "paycheck",
+            "monthly_income": monthly_income,
+            "days_until_paycheck": days_until_paycheck,
+        }, self.user_id)
+        self._budget_settings = None
+        self._state_changed()
 
-        print("\n  ✅ Paycheck mode configured!\n")
-        input("  Press Enter to continue...")
+        self._pause("\n  ✅ Paycheck mode configured!\n")
 
     def _setup_fixed_pool_mode(self) -> None:
         """Set up fixed-pool budgeting."""
@@ -558,11 +810,11 @@ class CLI:
         if total_money is None or total_money < 0:
             return
 
-        self.db.set_setting("budget_mode", "fixed_pool")
-        self.db.set_setting("total_money", total_money)
+        self.db.set_settings({"budget_mode": "fixed_pool", "total_money": total_money}, self.user_id)
+        self._budget_settings = None
+        self._state_changed()
 
-        print("\n  ✅ Fixed pool mode configured!\n")
-        input("  Press Enter to continue...")
+        self._pause("\n  ✅ Fixed pool mode configured!\n")
 
     def main_menu(self) -> None:
         """Display main menu and handle navigation."""
@@ -570,17 +822,12 @@ class CLI:
             self.clear_screen()
             self.print_header("THE NUMBER - Budget App")
 
-            options = [
-                "🎯 Get The Number (Daily Budget)",
-                "💵 Record Spending",
-                "📊 Manage Expenses",
-                "📝 View Transactions",
-                "⚙️  Setup Budget Mode",
-                "❌ Exit"
-            ]
-            self.print_menu(options)
+            self.print_menu(_MAIN_MENU)
+
+            choice = self.get_input("Select option", int, coalesce=True)
 
-            choice = self.get_input("Select option", int)
+            if choice in (1, 2, 3, 4, 5):
+                self._ensure_ready()
 
             if choice == 1:
                 self.get_the_number()
@@ -597,8 +844,7 @@ class CLI:
                 print("\n  Thanks for using The Number! 💰\n")
                 sys.exit(0)
             else:
-                print("\n  ❌ Invalid option. Please try again.\n")
-                input("  Press Enter to continue...")
+                self._pause("\n  ❌ Invalid option. Please try again.\n")
 
     def run(self) -> None:
         """Start the CLI application."""
@@ -611,3 +857,14 @@ class CLI:
         except Exception as e:
             print(f"\n  ❌ Error: {e}\n")
             sys.exit(1)
+
+
+def main() -> None:
+    """Entry point for running the CLI."""
+    cli = CLI.bootstrap()
+    if cli is not None:
+        cli.run()
+
+
+if __name__ == "__main__":
+    main()
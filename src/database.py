@@ -2,19 +2,229 @@
 Encrypted local database layer for The Number app.
 
 Uses SQLite with encryption for storing user data, expenses, and transactions.
-All sensitive data is encrypted at rest using Fernet symmetric encryption.
+All sensitive data is encrypted at rest with AES-256-GCM, using a key derived
+via HKDF from the app's Fernet-format encryption key. Values are stored as
+blobs: a version byte, a 12-byte nonce, then the ciphertext and tag. Fernet
+tokens and base64 text values from older versions are only read as legacy
+data, and are re-encrypted in the current format when the database is opened.
 """
 
+import base64
 import sqlite3
+import functools
 import json
+import math
 import os
+import queue
 import re
-from datetime import datetime
-from typing import List, Dict, Optional, Any
-from zoneinfo import ZoneInfo
-from cryptography.fernet import Fernet
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Any, Iterator, Sequence, Tuple
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; the stdlib json module is the fallback
+    orjson = None
+
+# Integers wider than 64 bits need at least 19 digits; orjson reads them back
+# as lossy floats, so values containing such a run are parsed by json instead
+_LONG_DIGIT_RUN = re.compile(rb"\d{19}")
+
+
+def _reject_non_finite(value: Any) -> None:
+    """Raise ValueError for NaN or Infinity anywhere in value; JSON cannot represent them."""
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError("Setting values cannot contain NaN or Infinity")
+    elif isinstance(value, dict):
+        for item in value.values():
+            _reject_non_finite(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _reject_non_finite(item)
+
+
+def _json_dumps(value: Any) -> bytes:
+    """Serialize a setting value to JSON bytes for _encrypt."""
+    # orjson would silently write these as null
+    _reject_non_finite(value)
+    if orjson is not None:
+        try:
+            # OPT_NON_STR_KEYS stringifies non-str dict keys the way json.dumps does
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers wider than 64 bits, which json accepts
+    return json.dumps(value).encode()
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse a decrypted setting value, including ones older versions wrote with json."""
+    if orjson is not None and not _LONG_DIGIT_RUN.search(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity literals json.dumps used to write
+    return json.loads(data)
+
+
+# Fixed-offset UTC; cheaper than a ZoneInfo lookup and formats the same (+00:00)
+_UTC = timezone.utc
+
+# Applied to every connection; journal_mode is set on the writer only
+_CONNECTION_PRAGMAS = (
+    "busy_timeout=5000",
+    # With WAL, NORMAL only syncs at checkpoints and is still crash-safe
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "cache_size=-64000",
+    "mmap_size=268435456",
+    "foreign_keys=ON",
+)
+# Most (user_id, key) settings kept decrypted in memory; least recently used
+# entries are evicted first
+_SETTINGS_CACHE_SIZE = 1024
+
+# Idle read-only connections kept for reuse; more are opened under load
+_READER_POOL_SIZE = 4
+
+# Encrypted values are stored as raw bytes (version || nonce || ciphertext+tag).
+# Older rows are base64 text: Fernet tokens, whose 0x80 version byte encodes
+# to a leading "g", or the same AES-GCM layout base64-encoded
+_FERNET_PREFIX = "g"
+_AESGCM_VERSION = 0x01
+_AESGCM_HEADER = bytes([_AESGCM_VERSION])
+_AESGCM_NONCE_SIZE = 12
+
+_BAR = "=" * 60
+_KEY_WARNING = f"""
+{_BAR}
+IMPORTANT: Save this encryption key securely!
+You will need it to access your data.
+{_BAR}
+
+Encryption Key (masked): {{masked_key}}
+
+Full key saved to: .env file
+
+WARNING: Without this key, you cannot access your data!
+Keep the .env file secure and backed up!
+{_BAR}
+
+"""
+
+# Columns returned for an expense, in the order callers' dicts are built
+_EXPENSE_COLUMNS = "id, name, amount, is_fixed, frequency, created_at, updated_at"
+_SQL_SELECT_EXPENSES = (
+    f"SELECT {_EXPENSE_COLUMNS} FROM expenses WHERE user_id = ? ORDER BY created_at DESC"
+)
+_SQL_SELECT_EXPENSE_SUMMARY = (
+    f"SELECT {_EXPENSE_COLUMNS}, SUM(amount) OVER () AS total FROM expenses "
+    "WHERE user_id = ? ORDER BY created_at DESC"
+)
+_SQL_SELECT_EXPENSE_BY_ID = f"SELECT {_EXPENSE_COLUMNS} FROM expenses WHERE id = ? AND user_id = ?"
+
+# Insert statements shared by the single-row and bulk paths. The single-row
+# paths use the RETURNING variants to get the new id from the insert itself
+_SQL_INSERT_EXPENSE = """
+    INSERT INTO expenses (user_id, name, amount, is_fixed, frequency, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_TRANSACTION = """
+    INSERT INTO transactions (user_id, date, amount, description, category, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_EXPENSE_RETURNING_ID = _SQL_INSERT_EXPENSE + "RETURNING id"
+_SQL_INSERT_TRANSACTION_RETURNING_ID = _SQL_INSERT_TRANSACTION + "RETURNING id"
+
+# One statement for every combination of fields; a NULL parameter keeps the
+# stored value
+_SQL_UPDATE_EXPENSE = """
+    UPDATE expenses SET
+        name = COALESCE(?, name),
+        amount = COALESCE(?, amount),
+        is_fixed = COALESCE(?, is_fixed),
+        frequency = COALESCE(?, frequency),
+        updated_at = ?
+    WHERE id = ? AND user_id = ?
+"""
+
+# Shared by set_setting and set_settings
+_SQL_UPSERT_SETTING = """
+    INSERT INTO settings (user_id, key, value, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, key) DO UPDATE SET
+        value = excluded.value,
+        updated_at = excluded.updated_at
+"""
+
+
+def _select_transactions_sql(start: bool, end: bool, limit: bool) -> str:
+    """Build the get_transactions query for one combination of filters."""
+    # Select only the returned columns; ORDER BY/LIMIT run in SQLite on the
+    # (user_id, date) index so only the requested rows are read
+    return (
+        "SELECT id, date, amount, description, category, created_at "
+        "FROM transactions WHERE user_id = ?"
+        + (" AND date >= ?" if start else "")
+        + (" AND date <= ?" if end else "")
+        + " ORDER BY date DESC"
+        + (" LIMIT ?" if limit else "")
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _select_settings_sql(key_count: int) -> str:
+    """Build (once per key count) the get_settings_bulk query for key_count keys."""
+    placeholders = ", ".join("?" * key_count)
+    return f"SELECT key, value FROM settings WHERE user_id = ? AND key IN ({placeholders})"
+
+
+@functools.lru_cache(maxsize=8)
+def _ciphers(key: bytes) -> Tuple[Fernet, AESGCM]:
+    """Build (once per key) the legacy Fernet cipher and the AES-GCM cipher derived from it."""
+    aead_key = HKDF(
+        algorithm=hashes.SHA256(), length=32, salt=None, info=b"the-number aes-gcm v1"
+    ).derive(base64.urlsafe_b64decode(key))
+    return Fernet(key), AESGCM(aead_key)
+
+
+# A token always decrypts to the same plaintext (each encrypt gets a fresh
+# nonce, so a changed value is a new token), so results can be cached without
+# invalidation; bounded to limit plaintext in memory. Module level rather than
+# per instance so the cache never keeps an EncryptedDatabase (and its open
+# connections) alive
+@functools.lru_cache(maxsize=512)
+def _decrypt_cached(key: bytes, encrypted_data: str | bytes) -> bytes:
+    """Decrypt a settings value with the ciphers for key."""
+    fernet, aead = _ciphers(key)
+    if isinstance(encrypted_data, bytes):
+        token = encrypted_data
+    elif encrypted_data.startswith(_FERNET_PREFIX):
+        # Checked on the text so Fernet tokens are only base64-decoded once
+        return fernet.decrypt(encrypted_data)
+    else:
+        token = base64.urlsafe_b64decode(encrypted_data)
+    nonce = token[1:1 + _AESGCM_NONCE_SIZE]
+    return aead.decrypt(nonce, token[1 + _AESGCM_NONCE_SIZE:], None)
+
+
+# get_transactions queries keyed by (has start_date, has end_date, has limit),
+# built once so each call reuses the same SQL text
+_SQL_SELECT_TRANSACTIONS = {
+    (start, end, limit): _select_transactions_sql(start, end, limit)
+    for start in (False, True) for end in (False, True) for limit in (False, True)
+}
+
 
 class EncryptedDatabase:
     """Manages encrypted local SQLite database for budget data."""
@@ -31,15 +241,43 @@ class EncryptedDatabase:
 
         # Initialize encryption
         if encryption_key:
-            self.cipher = Fernet(encryption_key.encode())
+            key = encryption_key.encode()
         else:
             # Generate new key if none provided
             key = Fernet.generate_key()
-            self.cipher = Fernet(key)
             self._save_key_warning(key)
-
+        self._key = key
+        # Fernet is kept to read rows written before the switch to AES-GCM
+        self.cipher, self._aead = _ciphers(key)
+
+        # One read-write connection for the lifetime of this object, shared
+        # across threads; _lock serializes use so transactions never interleave
+        self._lock = threading.RLock()
+        self._in_memory = db_path == ":memory:" or db_path.startswith("file::memory:")
+        # Resolved now, so readers opened after a chdir() find the writer's file
+        self._reader_uri = None if self._in_memory else Path(db_path).resolve().as_uri() + "?mode=ro"
+        # Autocommit: single statements commit themselves; _transaction()
+        # groups statements that must apply together
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256,
+                                     isolation_level=None)
+        self._configure_connection(self._conn)
+        # Only takes effect on a new, empty file; pins pages to the OS page
+        # size that mmap_size reads through, whatever SQLite's build default
+        self._conn.execute("PRAGMA page_size=4096")
+        # In-memory databases cannot use WAL, so they keep their journal in memory
+        self._conn.execute(f"PRAGMA journal_mode={'MEMORY' if self._in_memory else 'WAL'}")
+        # Read-only connections for _reader(); under WAL they never block the
+        # writer or each other
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=_READER_POOL_SIZE)
+
+        # (user_id, key) -> (loaded_at, decrypted JSON). Settings change rarely,
+        # so repeat reads skip the query and the decrypt
+        self._settings_cache: "OrderedDict[Tuple[int, str], Tuple[float, bytes]]" = OrderedDict()
+        self._settings_cache_lock = threading.Lock()
+        self._settings_ttl = 60.0
         # Initialize database
         self._init_database()
+        self._upgrade_legacy_settings()
 
     def _save_key_warning(self, key: bytes) -> None:
         """Warn user to save their encryption key."""
@@ -47,120 +285,239 @@ class EncryptedDatabase:
         # Mask key for security (show first/last 4 chars only)
         masked_key = f"{key_str[:4]}...{key_str[-4:]}"
 
-        print("\n" + "="*60)
-        print("IMPORTANT: Save this encryption key securely!")
-        print("You will need it to access your data.")
-        print("="*60)
-        print(f"\nEncryption Key (masked): {masked_key}")
-        print("\nFull key saved to: .env file")
-        print("\nWARNING: Without this key, you cannot access your data!")
-        print("Keep the .env file secure and backed up!")
-        print("="*60 + "\n")
+        sys.stderr.write(_KEY_WARNING.format(masked_key=masked_key))
 
-    def _init_database(self) -> None:
-        """Create database tables if they don't exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+    @staticmethod
+    def _configure_connection(conn: sqlite3.Connection) -> None:
+        """Set row_factory and apply PRAGMAs to a connection, once, when it is opened."""
+        conn.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(f"PRAGMA {pragma}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Use the shared connection for autocommitted statements.
 
-            # Enable WAL mode for better concurrent read/write performance
-            cursor.execute("PRAGMA journal_mode=WAL")
-            cursor.execute("PRAGMA busy_timeout=5000")
+        Holds the lock throughout so statements from other threads never
+        land inside a _transaction().
+        """
+        with self._lock:
+            yield self._conn
 
-            # Schema version tracking
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS schema_version (
-                    version INTEGER PRIMARY KEY,
-                    applied_at TEXT NOT NULL,
-                    description TEXT
-                )
-            """)
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Use the shared connection for statements that must apply together.
 
-            # Users table - must be created first for foreign keys
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    email TEXT,
-                    created_at TEXT NOT NULL
-                )
-            """)
+        Takes the write lock up front (BEGIN IMMEDIATE), commits on success
+        and rolls back on error. Nested use joins the outer transaction.
+        """
+        with self._lock:
+            if self._conn.in_transaction:
+                yield self._conn
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            try:
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                # e.g. a deferred foreign key failing; don't leave it open
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+
+    @contextmanager
+    def bulk(self) -> Iterator[None]:
+        """
+        Group several write calls into one transaction and one commit.
 
-            # User settings table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS settings (
-                    id INTEGER PRIMARY KEY,
-                    user_id INTEGER NOT NULL,
-                    key TEXT NOT NULL,
-                    value TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                    UNIQUE(user_id, key)
-                )
-            """)
+        Example:
+            with db.bulk():
+                for row in rows:
+                    db.add_transaction(row.amount, row.description, user_id)
 
-            # Expenses table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS expenses (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    name TEXT NOT NULL,
-                    amount REAL NOT NULL,
-                    is_fixed INTEGER NOT NULL,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            """)
+        Everything inside is rolled back if an exception escapes. Reads made
+        inside the block see only committed data, not its own pending writes.
+        Foreign keys are checked at commit, so rows may be written before the
+        user they belong to.
+        """
+        try:
+            with self._transaction() as conn:
+                # Reset by SQLite itself when the transaction ends
+                conn.execute("PRAGMA defer_foreign_keys=ON")
+                yield
+        finally:
+            # Reads inside the block may have cached values from before its
+            # writes were committed (or rolled back)
+            self.clear_settings_cache()
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a read-only connection for queries that do not write.
 
-            # Transactions table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS transactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    date TEXT NOT NULL,
-                    amount REAL NOT NULL,
-                    description TEXT NOT NULL,
-                    category TEXT,
-                    created_at TEXT NOT NULL,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            """)
+        Connections are reused from a small pool and opened on demand. An
+        in-memory database exists only on the writer connection, so it is
+        read through _connect() instead.
+        """
+        if self._in_memory:
+            with self._connect() as conn:
+                yield conn
+            return
 
-            # Password reset tokens (persistent across restarts)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS reset_tokens (
-                    token TEXT PRIMARY KEY,
-                    username TEXT NOT NULL,
-                    expires_at TEXT NOT NULL
-                )
-            """)
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = sqlite3.connect(self._reader_uri, uri=True, check_same_thread=False, cached_statements=256)
+            self._configure_connection(conn)
+        try:
+            yield conn
+        finally:
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
 
-            # Migration: Add user_id to existing tables if they don't have it
-            self._migrate_add_user_id(cursor)
+    @contextmanager
+    def read_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a read-only connection for queries this class has no method for.
 
-            # Run versioned migrations
-            self._run_migrations(cursor)
+        Example:
+            with db.read_connection() as conn:
+                total_users = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
 
-            conn.commit()
+        Setting values read this way are still encrypted; pass them to
+        decrypt_setting.
+        """
+        with self._reader() as conn:
+            yield conn
 
-    def _run_migrations(self, cursor) -> None:
-        """Run versioned migrations in order, tracking which have been applied."""
-        migrations = [
+    def _init_database(self) -> None:
+        """Create database tables if they don't exist."""
+        # Migrations rebuild tables by copying their rows, and databases from
+        # before foreign keys were enforced can hold rows for a user_id with no
+        # user (legacy data was assigned to user 1). As in SQLite's table
+        # rebuild procedure, enforcement is off while they run; the pragma is
+        # a no-op inside a transaction, so it is switched around it
+        self._conn.execute("PRAGMA foreign_keys=OFF")
+        try:
+            with self._transaction() as conn:
+                cursor = conn.cursor()
+
+                # Schema version tracking
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        applied_at TEXT NOT NULL,
+                        description TEXT
+                    )
+                """)
+
+                # Users table - must be created first for foreign keys
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS users (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        username TEXT UNIQUE NOT NULL,
+                        password_hash TEXT NOT NULL,
+                        email TEXT,
+                        created_at TEXT NOT NULL
+                    )
+                """)
+
+                # User settings table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS settings (
+                        user_id INTEGER NOT NULL,
+                        key TEXT NOT NULL,
+                        value BLOB NOT NULL,
+                        created_at TEXT NOT NULL,
+                        updated_at TEXT NOT NULL,
+                        PRIMARY KEY (user_id, key),
+                        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+                    ) WITHOUT ROWID
+                """)
+
+                # Expenses table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS expenses (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id INTEGER NOT NULL,
+                        name TEXT NOT NULL,
+                        amount REAL NOT NULL,
+                        is_fixed INTEGER NOT NULL,
+                        created_at TEXT NOT NULL,
+                        updated_at TEXT NOT NULL,
+                        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+                    )
+                """)
+
+                # Transactions table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS transactions (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id INTEGER NOT NULL,
+                        date TEXT NOT NULL,
+                        amount REAL NOT NULL,
+                        description TEXT NOT NULL,
+                        category TEXT,
+                        created_at TEXT NOT NULL,
+                        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+                    )
+                """)
+
+                # Password reset tokens (persistent across restarts)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS reset_tokens (
+                        token TEXT PRIMARY KEY,
+                        username TEXT NOT NULL,
+                        expires_at TEXT NOT NULL
+                    )
+                """)
+
+                # An up-to-date database has every migration recorded; it was last
+                # opened by a build that already ran everything below
+                cursor.execute("SELECT version FROM schema_version")
+                applied = {row[0] for row in cursor.fetchall()}
+                if applied.issuperset(version for version, _, _ in self._migrations()):
+                    return
+
+                # Migration: Add user_id to existing tables if they don't have it
+                self._migrate_add_user_id(cursor)
+
+                # Run versioned migrations
+                self._run_migrations(cursor, applied)
+        finally:
+            self._conn.execute("PRAGMA foreign_keys=ON")
+
+    def _migrations(self) -> List[Tuple[int, str, Any]]:
+        """Versioned migrations as (version, description, function), in order."""
+        return [
             (1, "Add indexes for query performance", self._migration_001_add_indexes),
             (2, "Clean up expired reset tokens", self._migration_002_cleanup_tokens),
             (3, "Add user_activity table for engagement metrics", self._migration_003_add_user_activity),
             (4, "Add frequency column to expenses", self._migration_004_add_expense_frequency),
+            (5, "Store transaction dates as UTC ISO strings", self._migration_005_normalize_transaction_dates),
+            (6, "Index expenses by user and creation time", self._migration_006_index_expenses_created),
+            (7, "Cover spending sums with the transaction date index", self._migration_007_cover_spending_sums),
+            (8, "Drop settings index duplicating UNIQUE(user_id, key)", self._migration_008_drop_duplicate_settings_index),
+            (9, "Store settings clustered on (user_id, key)", self._migration_009_settings_without_rowid),
+            (10, "Drop indexes duplicated by wider ones", self._migration_010_drop_redundant_indexes),
         ]
 
-        for version, description, migrate_fn in migrations:
-            cursor.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,))
-            if cursor.fetchone() is None:
+    def _run_migrations(self, cursor, applied: set) -> None:
+        """Run versioned migrations not in applied, in order, recording each one."""
+        for version, description, migrate_fn in self._migrations():
+            if version not in applied:
                 migrate_fn(cursor)
                 cursor.execute(
                     "INSERT INTO schema_version (version, applied_at, description) VALUES (?, ?, ?)",
-                    (version, datetime.now(ZoneInfo("UTC")).isoformat(), description)
+                    (version, datetime.now(_UTC).isoformat(), description)
                 )
 
     @staticmethod
@@ -196,38 +553,141 @@ class EncryptedDatabase:
         """Add frequency column to expenses table (weekly/monthly)."""
         cursor.execute("ALTER TABLE expenses ADD COLUMN frequency TEXT NOT NULL DEFAULT 'monthly'")
 
+    @staticmethod
+    def _migration_005_normalize_transaction_dates(cursor) -> None:
+        """Rewrite transaction dates in the format produced by _to_utc_iso."""
+        cursor.execute("SELECT id, date FROM transactions")
+        updates = []
+        for txn_id, date in cursor.fetchall():
+            try:
+                normalized = EncryptedDatabase._to_utc_iso(datetime.fromisoformat(date))
+            except (TypeError, ValueError):
+                continue  # Leave anything unparseable untouched
+            if normalized != date:
+                updates.append((normalized, txn_id))
+        cursor.executemany("UPDATE transactions SET date = ? WHERE id = ?", updates)
+
+    @staticmethod
+    def _migration_006_index_expenses_created(cursor) -> None:
+        """Serve get_expenses' ORDER BY created_at from an index instead of a sort."""
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_expenses_user_created ON expenses(user_id, created_at)")
+        # user_id alone is a prefix of the new index
+        cursor.execute("DROP INDEX IF EXISTS idx_expenses_user_id")
+
+    @staticmethod
+    def _migration_007_cover_spending_sums(cursor) -> None:
+        """Let the daily/period spending sums read only the index, not the table."""
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_transactions_user_date_amount "
+            "ON transactions(user_id, date, category, amount)"
+        )
+        # (user_id, date) is a prefix of the new index
+        cursor.execute("DROP INDEX IF EXISTS idx_transactions_date")
+
+    @staticmethod
+    def _migration_008_drop_duplicate_settings_index(cursor) -> None:
+        """Drop idx_settings_user_key; the UNIQUE(user_id, key) constraint already indexes it."""
+        cursor.execute("DROP INDEX IF EXISTS idx_settings_user_key")
+
+    @staticmethod
+    def _migration_009_settings_without_rowid(cursor) -> None:
+        """Rebuild settings as a WITHOUT ROWID table keyed by (user_id, key)."""
+        cursor.execute("PRAGMA table_info(settings)")
+        if 'id' not in [col[1] for col in cursor.fetchall()]:
+            return  # Created with the current schema
+
+        cursor.execute("""
+            CREATE TABLE settings_new (
+                user_id INTEGER NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (user_id, key),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            ) WITHOUT ROWID
+        """)
+        # Later rows win should a pre-user_id database hold duplicates
+        cursor.execute("""
+            INSERT OR REPLACE INTO settings_new (user_id, key, value, created_at, updated_at)
+            SELECT user_id, key, value, created_at, updated_at FROM settings ORDER BY id
+        """)
+        cursor.execute("DROP TABLE settings")
+        cursor.execute("ALTER TABLE settings_new RENAME TO settings")
+
+    @staticmethod
+    def _migration_010_drop_redundant_indexes(cursor) -> None:
+        """Drop indexes whose columns lead a wider index or UNIQUE constraint."""
+        # user_id leads idx_transactions_user_date_amount
+        cursor.execute("DROP INDEX IF EXISTS idx_transactions_user_id")
+        # username is UNIQUE, which SQLite already indexes
+        cursor.execute("DROP INDEX IF EXISTS idx_users_username")
+
     def _migrate_add_user_id(self, cursor) -> None:
         """Add user_id column to existing tables that don't have it."""
-        # Check and add user_id to settings
-        cursor.execute("PRAGMA table_info(settings)")
-        settings_cols = [col[1] for col in cursor.fetchall()]
-        if 'user_id' not in settings_cols:
+        # One query finds every table still missing the column
+        cursor.execute("""
+            SELECT m.name FROM sqlite_master AS m
+            WHERE m.type = 'table'
+              AND m.name IN ('settings', 'expenses', 'transactions')
+              AND NOT EXISTS (
+                  SELECT 1 FROM pragma_table_info(m.name) WHERE name = 'user_id'
+              )
+        """)
+        for (table,) in cursor.fetchall():
             # Add column (SQLite doesn't support adding foreign keys to existing tables easily)
-            cursor.execute("ALTER TABLE settings ADD COLUMN user_id INTEGER")
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN user_id INTEGER")
             # Set default user_id to 1 for existing data (if any users exist)
-            cursor.execute("UPDATE settings SET user_id = 1 WHERE user_id IS NULL")
-
-        # Check and add user_id to expenses
-        cursor.execute("PRAGMA table_info(expenses)")
-        expenses_cols = [col[1] for col in cursor.fetchall()]
-        if 'user_id' not in expenses_cols:
-            cursor.execute("ALTER TABLE expenses ADD COLUMN user_id INTEGER")
-            cursor.execute("UPDATE expenses SET user_id = 1 WHERE user_id IS NULL")
-
-        # Check and add user_id to transactions
-        cursor.execute("PRAGMA table_info(transactions)")
-        transactions_cols = [col[1] for col in cursor.fetchall()]
-        if 'user_id' not in transactions_cols:
-            cursor.execute("ALTER TABLE transactions ADD COLUMN user_id INTEGER")
-            cursor.execute("UPDATE transactions SET user_id = 1 WHERE user_id IS NULL")
-
-    def _encrypt(self, data: str) -> str:
-        """Encrypt a string."""
-        return self.cipher.encrypt(data.encode()).decode()
-
-    def _decrypt(self, encrypted_data: str) -> str:
-        """Decrypt a string."""
-        return self.cipher.decrypt(encrypted_data.encode()).decode()
+            cursor.execute(f"UPDATE {table} SET user_id = 1 WHERE user_id IS NULL")
+
+    def _upgrade_legacy_settings(self) -> None:
+        """
+        Re-encrypt settings still stored as text (Fernet or base64) as raw AES-GCM bytes.
+
+        Runs on every open rather than as a one-off migration: rows this key
+        cannot decrypt are skipped, not failed, so they are retried by the
+        next instance that has the right key.
+        """
+        with self._transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT user_id, key, value FROM settings WHERE typeof(value) = 'text'")
+            updates = []
+            for user_id, key, value in cursor.fetchall():
+                try:
+                    updates.append((self._encrypt(self._decrypt_bytes(value)), user_id, key))
+                except (InvalidToken, InvalidTag, ValueError):
+                    continue
+            cursor.executemany("UPDATE settings SET value = ? WHERE user_id = ? AND key = ?", updates)
+
+    def _encrypt(self, data: str | bytes) -> bytes:
+        """Encrypt a string or bytes (AES-256-GCM, as version || nonce || ciphertext+tag)."""
+        if isinstance(data, str):
+            data = data.encode()
+        nonce = os.urandom(_AESGCM_NONCE_SIZE)
+        return _AESGCM_HEADER + nonce + self._aead.encrypt(nonce, data, None)
+
+    def _decrypt(self, encrypted_data: str | bytes) -> str:
+        """Decrypt a value written by _encrypt or stored as text by older versions."""
+        return self._decrypt_bytes(encrypted_data).decode()
+
+    def _decrypt_bytes(self, encrypted_data: str | bytes) -> bytes:
+        """Like _decrypt, but return the plaintext bytes (JSON parsers take them as-is)."""
+        return _decrypt_cached(self._key, encrypted_data)
+
+    @staticmethod
+    def _to_utc_iso(value: datetime) -> str:
+        """
+        Format a datetime as a UTC ISO string, keeping any microseconds.
+
+        Transaction dates are stored this way so date ranges can be compared on
+        the raw column, which lets SQLite use the (user_id, date) index. With a
+        single +00:00 offset the strings sort in time order whether or not they
+        carry a fraction ('+' sorts before '.'). Naive datetimes are taken as
+        UTC, as SQLite's datetime() reads them.
+        """
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=_UTC)
+        return value.astimezone(_UTC).isoformat()
 
     @staticmethod
     def _sanitize_text(text: str) -> str:
@@ -265,19 +725,38 @@ class EncryptedDatabase:
             value: Setting value (will be encrypted)
             user_id: User ID this setting belongs to
         """
-        encrypted_value = self._encrypt(json.dumps(value))
-        now = datetime.now(ZoneInfo("UTC")).isoformat()
+        encrypted_value = self._encrypt(_json_dumps(value))
+        now = datetime.now(_UTC).isoformat()
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO settings (user_id, key, value, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?)
-                ON CONFLICT(user_id, key) DO UPDATE SET
-                    value = excluded.value,
-                    updated_at = excluded.updated_at
-            """, (user_id, key, encrypted_value, now, now))
-            conn.commit()
+        with self._connect() as conn:
+            conn.execute(_SQL_UPSERT_SETTING, (user_id, key, encrypted_value, now, now))
+        # Invalidate rather than write through: inside bulk() the write may
+        # still be rolled back
+        with self._settings_cache_lock:
+            self._settings_cache.pop((user_id, key), None)
+
+    def set_settings(self, items: Dict[str, Any], user_id: int) -> None:
+        """
+        Store several encrypted settings for a user in a single transaction.
+
+        Args:
+            items: Mapping of setting key to value (values will be encrypted)
+            user_id: User ID these settings belong to
+        """
+        if not items:
+            return
+
+        now = datetime.now(_UTC).isoformat()
+        rows = [
+            (user_id, key, self._encrypt(_json_dumps(value)), now, now)
+            for key, value in items.items()
+        ]
+
+        with self._transaction() as conn:
+            conn.executemany(_SQL_UPSERT_SETTING, rows)
+        with self._settings_cache_lock:
+            for key in items:
+                self._settings_cache.pop((user_id, key), None)
 
     def get_setting(self, key: str, user_id: int, default: Any = None) -> Any:
         """
@@ -291,16 +770,77 @@ class EncryptedDatabase:
         Returns:
             Decrypted setting value or default
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._settings_cache_lock:
+            cached = self._settings_cache.get((user_id, key))
+            if cached:
+                self._settings_cache.move_to_end((user_id, key))
+        if cached and time.monotonic() - cached[0] < self._settings_ttl:
+            # Parse on every hit so callers never share a mutable value
+            return _json_loads(cached[1])
+
+        with self._reader() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT value FROM settings WHERE key = ? AND user_id = ?", (key, user_id))
             row = cursor.fetchone()
 
             if row:
-                decrypted = self._decrypt(row[0])
-                return json.loads(decrypted)
+                decrypted = self._decrypt_bytes(row[0])
+                self._cache_setting(user_id, key, decrypted)
+                return _json_loads(decrypted)
             return default
 
+    def decrypt_setting(self, encrypted_value: str | bytes) -> Any:
+        """
+        Decrypt and parse a raw value from the settings table.
+
+        Args:
+            encrypted_value: The value column, as read through read_connection
+
+        Returns:
+            The stored setting value
+        """
+        return _json_loads(self._decrypt_bytes(encrypted_value))
+
+    def _cache_setting(self, user_id: int, key: str, plaintext: bytes) -> None:
+        """Store a decrypted setting, evicting the least recently used past the cap."""
+        with self._settings_cache_lock:
+            self._settings_cache[(user_id, key)] = (time.monotonic(), plaintext)
+            self._settings_cache.move_to_end((user_id, key))
+            if len(self._settings_cache) > _SETTINGS_CACHE_SIZE:
+                self._settings_cache.popitem(last=False)
+
+    def clear_settings_cache(self) -> None:
+        """Drop cached settings, e.g. after another process has changed them."""
+        with self._settings_cache_lock:
+            self._settings_cache.clear()
+
+    def get_settings_bulk(self, keys: List[str], user_id: int) -> Dict[str, Any]:
+        """
+        Retrieve and decrypt several settings for a user in a single query.
+
+        Args:
+            keys: Setting keys to fetch
+            user_id: User ID to fetch settings for
+
+        Returns:
+            Dict of key -> decrypted value. Keys with no stored value are omitted.
+        """
+        if not keys:
+            return {}
+
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_select_settings_sql(len(keys)), (user_id, *keys))
+            rows = cursor.fetchall()
+
+        settings = {}
+        for key, value in rows:
+            decrypted = self._decrypt_bytes(value)
+            # Warm the cache so later get_setting calls skip the database
+            self._cache_setting(user_id, key, decrypted)
+            settings[key] = _json_loads(decrypted)
+        return settings
+
     # Expense operations
     def add_expense(self, name: str, amount: float, user_id: int, is_fixed: bool = True,
                     frequency: str = "monthly") -> int:
@@ -317,30 +857,92 @@ class EncryptedDatabase:
         Returns:
             ID of created expense
         """
-        # Sanitize and validate expense data
+        name = self._validate_expense(name, amount, frequency)
+
+        now = datetime.now(_UTC).isoformat()
+
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_INSERT_EXPENSE_RETURNING_ID,
+                           (user_id, name, amount, bool(is_fixed), frequency, now, now))
+            expense_id = cursor.fetchone()[0]
+            return expense_id
+
+    def _validate_expense(self, name: str, amount: float, frequency: str) -> str:
+        """
+        Validate expense fields.
+
+        Returns:
+            Sanitized expense name
+
+        Raises:
+            ValueError: If any field is invalid
+        """
+        self._validate_expense_amount(amount)
+        name = self._validate_expense_name(name)
+        self._validate_expense_frequency(frequency)
+        return name
+
+    def _validate_expense_name(self, name: str) -> str:
+        """Sanitize and validate an expense name, returning the sanitized name."""
         name = self._sanitize_text(name)
+        if not name:
+            raise ValueError("Expense name is required")
+        if len(name) > 200:
+            raise ValueError("Expense name too long (max 200 characters)")
+        return name
 
+    @staticmethod
+    def _validate_expense_amount(amount: float) -> None:
+        """Raise ValueError if an expense amount is out of range."""
         if amount < 0:
             raise ValueError("Expense amount cannot be negative")
         if amount > 10_000_000:
             raise ValueError("Amount exceeds maximum ($10,000,000)")
-        if not name:
-            raise ValueError("Expense name is required")
-        if len(name) > 200:
-            raise ValueError("Expense name too long (max 200 characters)")
+
+    @staticmethod
+    def _validate_expense_frequency(frequency: str) -> None:
+        """Raise ValueError unless frequency is 'weekly' or 'monthly'."""
         if frequency not in ("weekly", "monthly"):
             raise ValueError("Frequency must be 'weekly' or 'monthly'")
 
-        now = datetime.now(ZoneInfo("UTC")).isoformat()
+    def bulk_add_expenses(self, expenses: List[Dict[str, Any]], user_id: int,
+                          replace: bool = False) -> Tuple[int, List[str]]:
+        """
+        Add many expenses for a user in a single transaction (e.g. a file import).
+
+        Invalid rows are skipped and reported; valid rows are inserted together
+        so the whole import costs one commit instead of one per row.
 
-        with sqlite3.connect(self.db_path) as conn:
+        Args:
+            expenses: Expense dicts with name, amount and optional is_fixed/frequency
+            user_id: User ID the expenses belong to
+            replace: Delete the user's existing expenses first (same transaction)
+
+        Returns:
+            Tuple of (number of expenses added, list of error messages)
+        """
+        now = datetime.now(_UTC).isoformat()
+        rows = []
+        errors = []
+
+        for exp in expenses:
+            is_fixed = exp.get("is_fixed", True)
+            frequency = exp.get("frequency", "monthly")
+            try:
+                name = self._validate_expense(exp["name"], exp["amount"], frequency)
+            except ValueError as e:
+                errors.append(f"Failed to import {exp['name']}: {e}")
+                continue
+            rows.append((user_id, name, exp["amount"], bool(is_fixed), frequency, now, now))
+
+        with self._transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO expenses (user_id, name, amount, is_fixed, frequency, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (user_id, name, amount, 1 if is_fixed else 0, frequency, now, now))
-            conn.commit()
-            return cursor.lastrowid
+            if replace:
+                cursor.execute("DELETE FROM expenses WHERE user_id = ?", (user_id,))
+            cursor.executemany(_SQL_INSERT_EXPENSE, rows)
+
+        return len(rows), errors
 
     def get_expenses(self, user_id: int) -> List[Dict[str, Any]]:
         """
@@ -352,24 +954,64 @@ class EncryptedDatabase:
         Returns:
             List of expense dictionaries
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        return list(self.iter_expenses(user_id))
+
+    def iter_expenses(self, user_id: int) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a user's expenses one at a time, newest first.
+
+        The connection stays borrowed until the iterator is exhausted or
+        closed, so consume it promptly.
+        """
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None  # Plain tuples; _expense_from_row unpacks by position
+            cursor.execute(_SQL_SELECT_EXPENSES, (user_id,))
+            for row in cursor:
+                yield self._expense_from_row(row)
+
+    @staticmethod
+    def _expense_from_row(row: Sequence[Any]) -> Dict[str, Any]:
+        """
+        Build an expense dict from a row selected as _EXPENSE_COLUMNS.
+
+        is_fixed is written as a bool, which sqlite3 stores as INTEGER 0/1;
+        it is turned back into a bool here because API responses expose it
+        as a JSON boolean.
+        """
+        expense_id, name, amount, is_fixed, frequency, created_at, updated_at = row
+        return {
+            "id": expense_id,
+            "name": name,
+            "amount": amount,
+            "is_fixed": bool(is_fixed),
+            "frequency": frequency,
+            "created_at": created_at,
+            "updated_at": updated_at
+        }
+
+    def get_expense_summary(self, user_id: int) -> Tuple[List[Dict[str, Any]], float]:
+        """
+        Get all expenses for a user together with their total amount.
+
+        The total is computed by SQLite in the same query, so callers that
+        render a list and its sum don't need a second pass over the rows.
+
+        Args:
+            user_id: User ID to fetch expenses for
+
+        Returns:
+            Tuple of (list of expense dictionaries, total amount)
+        """
+        with self._reader() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM expenses WHERE user_id = ? ORDER BY created_at DESC", (user_id,))
+            cursor.row_factory = None
+            cursor.execute(_SQL_SELECT_EXPENSE_SUMMARY, (user_id,))
             rows = cursor.fetchall()
 
-            return [
-                {
-                    "id": row["id"],
-                    "name": row["name"],
-                    "amount": row["amount"],
-                    "is_fixed": bool(row["is_fixed"]),
-                    "frequency": row["frequency"] if "frequency" in row.keys() else "monthly",
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"]
-                }
-                for row in rows
-            ]
+            expenses = [self._expense_from_row(row[:-1]) for row in rows]
+            total = rows[0][-1] if rows else 0.0
+            return expenses, total
 
     def get_expense_by_id(self, expense_id: int, user_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -382,83 +1024,42 @@ class EncryptedDatabase:
         Returns:
             Expense dictionary or None if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._reader() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM expenses WHERE id = ? AND user_id = ?", (expense_id, user_id))
+            cursor.row_factory = None
+            cursor.execute(_SQL_SELECT_EXPENSE_BY_ID, (expense_id, user_id))
             row = cursor.fetchone()
 
             if row is None:
                 return None
 
-            return {
-                "id": row["id"],
-                "name": row["name"],
-                "amount": row["amount"],
-                "is_fixed": bool(row["is_fixed"]),
-                "frequency": row["frequency"] if "frequency" in row.keys() else "monthly",
-                "created_at": row["created_at"],
-                "updated_at": row["updated_at"]
-            }
+            return self._expense_from_row(row)
 
     def update_expense(self, expense_id: int, user_id: int, name: Optional[str] = None,
                       amount: Optional[float] = None, is_fixed: Optional[bool] = None,
                       frequency: Optional[str] = None) -> None:
         """Update an expense for a specific user."""
-        # Whitelist of allowed columns (security: prevent SQL injection pattern)
-        ALLOWED_COLUMNS = {'name', 'amount', 'is_fixed', 'frequency', 'updated_at'}
-
-        updates = []
-        params = []
+        if name is None and amount is None and is_fixed is None and frequency is None:
+            return
 
         if name is not None:
-            if len(name) > 200:
-                raise ValueError("Expense name too long (max 200 characters)")
-            updates.append("name = ?")
-            params.append(name.strip())
+            name = self._validate_expense_name(name)
         if amount is not None:
-            if amount < 0:
-                raise ValueError("Amount cannot be negative")
-            if amount > 10_000_000:
-                raise ValueError("Amount exceeds maximum ($10,000,000)")
-            updates.append("amount = ?")
-            params.append(amount)
-        if is_fixed is not None:
-            updates.append("is_fixed = ?")
-            params.append(1 if is_fixed else 0)
+            self._validate_expense_amount(amount)
         if frequency is not None:
-            if frequency not in ("weekly", "monthly"):
-                raise ValueError("Frequency must be 'weekly' or 'monthly'")
-            updates.append("frequency = ?")
-            params.append(frequency)
-
-        if not updates:
-            return
+            self._validate_expense_frequency(frequency)
 
-        updates.append("updated_at = ?")
-        params.append(datetime.now(ZoneInfo("UTC")).isoformat())
-        params.append(expense_id)
-        params.append(user_id)
-
-        # Validate all update columns are in whitelist (prevent SQL injection)
-        update_cols = {u.split('=')[0].strip() for u in updates}
-        if not update_cols.issubset(ALLOWED_COLUMNS):
-            raise ValueError("Invalid column names in update")
-
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                f"UPDATE expenses SET {', '.join(updates)} WHERE id = ? AND user_id = ?",
-                params
-            )
-            conn.commit()
+            cursor.execute(_SQL_UPDATE_EXPENSE, (
+                name, amount, None if is_fixed is None else bool(is_fixed), frequency,
+                datetime.now(_UTC).isoformat(), expense_id, user_id
+            ))
 
     def delete_expense(self, expense_id: int, user_id: int) -> None:
         """Delete an expense for a specific user."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM expenses WHERE id = ? AND user_id = ?", (expense_id, user_id))
-            conn.commit()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM expenses WHERE id = ? AND user_id = ?", (expense_id, user_id))
 
     # Transaction operations
     def add_transaction(self, amount: float, description: str, user_id: int,
@@ -476,7 +1077,23 @@ class EncryptedDatabase:
         Returns:
             ID of created transaction
         """
-        # Sanitize and validate transaction data
+        description, category = self._validate_transaction(amount, description, category)
+
+        now = datetime.now(_UTC)
+        if date is None:
+            date = now
+
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_INSERT_TRANSACTION_RETURNING_ID, (
+                user_id, self._to_utc_iso(date), amount, description, category, now.isoformat()
+            ))
+            transaction_id = cursor.fetchone()[0]
+            return transaction_id
+
+    def _validate_transaction(self, amount: float, description: str,
+                              category: Optional[str]) -> Tuple[str, Optional[str]]:
+        """Sanitize and validate transaction fields, returning (description, category)."""
         description = self._sanitize_text(description)
         if category:
             category = self._sanitize_text(category)
@@ -490,17 +1107,44 @@ class EncryptedDatabase:
         if len(description) > 200:
             raise ValueError("Description too long (max 200 characters)")
 
-        if date is None:
-            date = datetime.now(ZoneInfo("UTC"))
+        return description, category
 
-        with sqlite3.connect(self.db_path) as conn:
+    def bulk_add_transactions(self, transactions: List[Dict[str, Any]],
+                              user_id: int) -> Tuple[int, List[str]]:
+        """
+        Record many transactions for a user in a single transaction.
+
+        Same contract as bulk_add_expenses: invalid rows are skipped and
+        reported, valid rows are inserted with one executemany and one commit.
+
+        Args:
+            transactions: Dicts with amount, description and optional date/category
+            user_id: User ID the transactions belong to
+
+        Returns:
+            Tuple of (number of transactions added, list of error messages)
+        """
+        now = datetime.now(_UTC)
+        created_at = now.isoformat()
+        rows = []
+        errors = []
+
+        for txn in transactions:
+            try:
+                description, category = self._validate_transaction(
+                    txn["amount"], txn["description"], txn.get("category")
+                )
+            except ValueError as e:
+                errors.append(f"Failed to import {txn['description']}: {e}")
+                continue
+            date = txn.get("date") or now
+            rows.append((user_id, self._to_utc_iso(date), txn["amount"], description, category, created_at))
+
+        with self._transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO transactions (user_id, date, amount, description, category, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (user_id, date.isoformat(), amount, description, category, datetime.now(ZoneInfo("UTC")).isoformat()))
-            conn.commit()
-            return cursor.lastrowid
+            cursor.executemany(_SQL_INSERT_TRANSACTION, rows)
+
+        return len(rows), errors
 
     def get_transactions(self, user_id: int, start_date: Optional[datetime] = None,
                         end_date: Optional[datetime] = None,
@@ -517,46 +1161,37 @@ class EncryptedDatabase:
         Returns:
             List of transaction dictionaries
         """
-        query = "SELECT * FROM transactions WHERE user_id = ?"
-        params = [user_id]
+        return list(self.iter_transactions(user_id, start_date, end_date, limit))
+
+    def iter_transactions(self, user_id: int, start_date: Optional[datetime] = None,
+                          end_date: Optional[datetime] = None,
+                          limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield transactions one at a time; same filters as get_transactions.
 
+        The connection stays borrowed until the iterator is exhausted or
+        closed, so consume it promptly.
+        """
+        query = _SQL_SELECT_TRANSACTIONS[(bool(start_date), bool(end_date), bool(limit))]
+        params = [user_id]
         if start_date:
-            query += " AND date >= ?"
-            params.append(start_date.isoformat())
+            params.append(self._to_utc_iso(start_date))
         if end_date:
-            query += " AND date <= ?"
-            params.append(end_date.isoformat())
-
-        query += " ORDER BY date DESC"
-
+            params.append(self._to_utc_iso(end_date))
         if limit:
-            query += " LIMIT ?"
             params.append(limit)
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._reader() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
-            rows = cursor.fetchall()
-
-            return [
-                {
-                    "id": row["id"],
-                    "date": row["date"],
-                    "amount": row["amount"],
-                    "description": row["description"],
-                    "category": row["category"],
-                    "created_at": row["created_at"]
-                }
-                for row in rows
-            ]
+            # The selected columns are exactly the dict's keys
+            for row in cursor:
+                yield dict(row)
 
     def delete_transaction(self, transaction_id: int, user_id: int) -> None:
         """Delete a transaction for a specific user."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM transactions WHERE id = ? AND user_id = ?", (transaction_id, user_id))
-            conn.commit()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM transactions WHERE id = ? AND user_id = ?", (transaction_id, user_id))
 
     def get_total_spending_today(self, user_id: int, user_timezone: str | None = None) -> float:
         """
@@ -582,22 +1217,26 @@ class EncryptedDatabase:
         from api.utils.dates import get_user_day_boundaries_utc
 
         start_utc, end_utc = get_user_day_boundaries_utc(user_timezone)
+        # end_utc is 23:59:59.999999 local; one microsecond on is the next
+        # local midnight, giving a half-open [start, next_start) range
+        next_start_utc = end_utc + timedelta(microseconds=1)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._reader() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None
             # Calculate net spending: expenses add, income subtracts
-            # Query using UTC boundaries that correspond to user's local "today"
+            # Query using UTC boundaries that correspond to user's local "today";
+            # dates are stored via _to_utc_iso, so the raw column compares correctly
             cursor.execute("""
                 SELECT COALESCE(SUM(
                     CASE WHEN category = 'income' THEN -amount ELSE amount END
-                ), 0) as net_spending
+                ), 0.0) as net_spending
                 FROM transactions
                 WHERE user_id = ?
-                  AND datetime(date) >= datetime(?)
-                  AND datetime(date) <= datetime(?)
-            """, (user_id, start_utc.isoformat(), end_utc.isoformat()))
-            result = cursor.fetchone()
-            return result[0] if result[0] else 0.0
+                  AND date >= ?
+                  AND date < ?
+            """, (user_id, self._to_utc_iso(start_utc), self._to_utc_iso(next_start_utc)))
+            return cursor.fetchone()[0]
 
     def get_transactions_sum_for_period(self, user_id: int, start_date: datetime, end_date: datetime) -> float:
         """
@@ -614,19 +1253,19 @@ class EncryptedDatabase:
         Returns:
             Net spending amount (can be negative if income > expenses)
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._reader() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None
             cursor.execute("""
                 SELECT COALESCE(SUM(
                     CASE WHEN category = 'income' THEN -amount ELSE amount END
-                ), 0) as net_spending
+                ), 0.0) as net_spending
                 FROM transactions
                 WHERE user_id = ?
-                  AND datetime(date) >= datetime(?)
-                  AND datetime(date) < datetime(?)
-            """, (user_id, start_date.isoformat(), end_date.isoformat()))
-            result = cursor.fetchone()
-            return result[0] if result[0] else 0.0
+                  AND date >= ?
+                  AND date < ?
+            """, (user_id, self._to_utc_iso(start_date), self._to_utc_iso(end_date)))
+            return cursor.fetchone()[0]
 
     # ========================================================================
     # USER MANAGEMENT
@@ -658,17 +1297,19 @@ class EncryptedDatabase:
         if len(username) > 50:
             raise ValueError("Username too long (max 50 characters)")
 
-        with sqlite3.connect(self.db_path) as conn:
+        now = datetime.now(_UTC).isoformat()
+
+        with self._connect() as conn:
             cursor = conn.cursor()
-            now = datetime.now(ZoneInfo("UTC")).isoformat()
 
             try:
                 cursor.execute("""
                     INSERT INTO users (username, password_hash, email, created_at)
                     VALUES (?, ?, ?, ?)
+                    RETURNING id
                 """, (username, password_hash, email, now))
-                conn.commit()
-                return cursor.lastrowid
+                user_id = cursor.fetchone()[0]
+                return user_id
             except sqlite3.IntegrityError:
                 raise ValueError(f"Username '{username}' already exists")
 
@@ -682,7 +1323,7 @@ class EncryptedDatabase:
         Returns:
             User dict or None if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id, username, password_hash, email, created_at
@@ -711,7 +1352,7 @@ class EncryptedDatabase:
         Returns:
             User dict or None if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id, username, password_hash, email, created_at
@@ -741,22 +1382,17 @@ class EncryptedDatabase:
         Raises:
             ValueError: If user doesn't exist
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
-
-            # Verify user exists
-            cursor.execute("SELECT id FROM users WHERE id = ?", (user_id,))
-            if not cursor.fetchone():
-                raise ValueError(f"User with ID {user_id} not found")
-
-            # Update password
             cursor.execute("""
                 UPDATE users
                 SET password_hash = ?
                 WHERE id = ?
             """, (new_password_hash, user_id))
 
-            conn.commit()
+            # No row updated means no such user
+            if cursor.rowcount == 0:
+                raise ValueError(f"User with ID {user_id} not found")
 
     # ========================================================================
     # RESET TOKEN STORAGE (persistent across restarts)
@@ -764,17 +1400,16 @@ class EncryptedDatabase:
 
     def store_reset_token(self, token: str, username: str, expires_at: datetime) -> None:
         """Store a password reset token in the database."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT OR REPLACE INTO reset_tokens (token, username, expires_at) VALUES (?, ?, ?)",
                 (token, username, expires_at.isoformat())
             )
-            conn.commit()
 
     def get_reset_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Retrieve a reset token if it exists and hasn't expired."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT username, expires_at FROM reset_tokens WHERE token = ? AND datetime(expires_at) > datetime('now')",
@@ -787,21 +1422,17 @@ class EncryptedDatabase:
 
     def delete_reset_token(self, token: str) -> None:
         """Delete a reset token after use."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM reset_tokens WHERE token = ?", (token,))
-            conn.commit()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM reset_tokens WHERE token = ?", (token,))
 
     def cleanup_expired_tokens(self) -> None:
         """Remove all expired reset tokens."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM reset_tokens WHERE datetime(expires_at) < datetime('now')")
-            conn.commit()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM reset_tokens WHERE datetime(expires_at) < datetime('now')")
 
     def record_user_activity(self, user_id: int, activity_date: str) -> None:
         """Record user activity for engagement metrics (DAU/WAU/MAU)."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO user_activity (user_id, activity_date, login_count)
@@ -809,12 +1440,17 @@ class EncryptedDatabase:
                 ON CONFLICT(user_id, activity_date) DO UPDATE SET
                     login_count = login_count + 1
             """, (user_id, activity_date))
-            conn.commit()
 
     def close(self) -> None:
-        """Close database connection (cleanup)."""
-        # SQLite connections are closed automatically with context managers
-        pass
+        """Close the database connections and drop cached settings."""
+        with self._lock:
+            self._conn.close()
+        self.clear_settings_cache()
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
 
 
 # Alias for backwards compatibility and clearer naming
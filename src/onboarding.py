@@ -5,35 +5,39 @@ Provides a step-by-step guided setup process for new users to configure
 their budget and get their first daily spending number.
 """
 
-import os
 from typing import Optional, Dict, Any
 from .database import EncryptedDatabase
+from .utils import clear_screen
+
+# Rules drawn around headers and between onboarding sections
+_BAR = "=" * 70
+_RULE = "-" * 70
 
 
 class Onboarding:
     """Handles first-time user onboarding and setup."""
 
-    def __init__(self, db: EncryptedDatabase):
-        """Initialize onboarding with database connection."""
+    def __init__(self, db: EncryptedDatabase, user_id: int):
+        """Initialize onboarding with database connection and the user being set up."""
         self.db = db
+        self.user_id = user_id
+        # Expenses saved to the database by run(), for callers that keep their own copy
+        self.saved_expenses: list = []
 
     def clear_screen(self) -> None:
         """Clear the terminal screen."""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        clear_screen()
 
     def print_header(self, title: str, subtitle: str = "") -> None:
         """Print a formatted header."""
         self.clear_screen()
-        print("\n" + "="*70)
-        print(f"  {title}")
-        if subtitle:
-            print(f"  {subtitle}")
-        print("="*70 + "\n")
+        subtitle_line = f"  {subtitle}\n" if subtitle else ""
+        print(f"\n{_BAR}\n  {title}\n{subtitle_line}{_BAR}\n")
 
     def print_step(self, step_num: int, total_steps: int, title: str) -> None:
         """Print step progress."""
         print(f"\n  > Step {step_num} of {total_steps}: {title}\n")
-        print("-"*70 + "\n")
+        print(_RULE + "\n")
 
     def get_input(self, prompt: str, input_type: type = str,
                   allow_empty: bool = False, validate=None) -> any:
@@ -102,14 +106,14 @@ class Onboarding:
 
         print("  The Number helps you answer one simple question:\n")
         print("  [$] \"How much can I spend today?\"\n")
-        print("-"*70 + "\n")
+        print(_RULE + "\n")
         print("  This quick setup will take about 2 minutes.\n")
         print("  We'll help you:\n")
         print("    1.  Choose your budgeting style")
         print("    2.  Add your income or available money")
         print("    3.  List your monthly expenses")
         print("    4.  Get your first daily budget number!\n")
-        print("-"*70 + "\n")
+        print(_RULE + "\n")
 
         return self.get_yes_no("Ready to get started?")
 
@@ -125,7 +129,7 @@ class Onboarding:
         print("  2.  I have a fixed amount of money that needs to last")
         print("     → Choose FIXED POOL MODE")
         print("     → We'll show you how long your money will last\n")
-        print("-"*70 + "\n")
+        print(_RULE + "\n")
 
         choice = self.get_input(
             "Select your mode (1 or 2)",
@@ -144,7 +148,7 @@ class Onboarding:
         self.print_step(2, 4, "Paycheck Mode Setup")
 
         print("  Let's set up your income and paycheck schedule.\n")
-        print("-"*70 + "\n")
+        print(_RULE + "\n")
 
         # Get monthly income
         monthly_income = self.get_input(
@@ -183,7 +187,7 @@ class Onboarding:
         self.print_step(2, 4, "Fixed Pool Mode Setup")
 
         print("  Let's set up your available money.\n")
-        print("-"*70 + "\n")
+        print(_RULE + "\n")
 
         total_money = self.get_input(
             "How much money do you have available? $",
@@ -209,7 +213,7 @@ class Onboarding:
         print("  Now let's add your monthly expenses (rent, bills, etc.).\n")
         print("  These are costs you MUST pay each month.\n")
         print("  Your daily budget will be what's LEFT OVER after these.\n")
-        print("-"*70 + "\n")
+        print(_RULE + "\n")
 
         expenses = []
         total = 0.0
@@ -224,7 +228,7 @@ class Onboarding:
 
         print("\n  Common expenses: Rent, Utilities, Phone, Internet, Insurance,")
         print("                   Groceries, Transportation, Subscriptions\n")
-        print("-"*70 + "\n")
+        print(_RULE + "\n")
 
         while True:
             print(f"\n  Current total expenses: ${total:,.2f}\n")
@@ -272,7 +276,7 @@ class Onboarding:
                 break
 
         if expenses:
-            print("\n" + "-"*70)
+            print("\n" + _RULE)
             print(f"\n  [CHART] Total Monthly Expenses: ${total:,.2f}\n")
             print("  Breakdown:")
             for exp in expenses:
@@ -311,11 +315,11 @@ class Onboarding:
             print(f"    Money After Expenses:  ${result['remaining_money']:>10,.2f}")
             print(f"    Days Until Paycheck:   {result['days_remaining']:>10}")
             print()
-            print("="*70)
+            print(_BAR)
             print()
             print(f"         [*] THE NUMBER: ${result['daily_limit']:>10,.2f} per day")
             print()
-            print("="*70)
+            print(_BAR)
             print()
 
             if result['daily_limit'] <= 0:
@@ -338,19 +342,19 @@ class Onboarding:
 
             print("  [$] Your Budget Summary:\n")
             print(f"    Total Money:           ${result['total_money']:>10,.2f}")
-            print(f"    Monthly Expenses:      ${result['monthly_expenses']:>10,.2f}")
+            print(f"    Monthly Expenses:      ${result['total_expenses']:>10,.2f}")
             print(f"    ─────────────────────────────────────────")
-            if months == float('inf'):
+            if months is None:
                 print(f"    Money Will Last:       Indefinitely!")
             else:
                 print(f"    Money Will Last:       {months:>10,.1f} months")
                 print(f"                           ({days:>10,.0f} days)")
             print()
-            print("="*70)
+            print(_BAR)
             print()
             print(f"         [*] THE NUMBER: ${result['daily_limit']:>10,.2f} per day")
             print()
-            print("="*70)
+            print(_BAR)
             print()
 
             if result['daily_limit'] <= 0:
@@ -366,13 +370,13 @@ class Onboarding:
                 print("  [OK] Your money will last for a while!")
                 print("     Stick to your daily limit to stay on track.\n")
 
-        print("-"*70 + "\n")
+        print(_RULE + "\n")
         print("  [TIP] Tips for Success:\n")
         print("    • Check 'The Number' every morning")
         print("    • Record your spending throughout the day")
         print("    • Stay under your daily limit to stay on budget")
         print("    • Update your expenses if anything changes\n")
-        print("-"*70 + "\n")
+        print(_RULE + "\n")
 
         input("  Press Enter to go to the main menu...")
 
@@ -385,7 +389,7 @@ class Onboarding:
         """
         try:
             # Check if already onboarded
-            if self.db.get_setting("onboarded"):
+            if self.db.get_setting("onboarded", self.user_id):
                 return True
 
             # Step 0: Welcome
@@ -414,19 +418,22 @@ class Onboarding:
                 return False
 
             # Save everything to database
-            self.db.set_setting("budget_mode", config["mode"])
+            settings = {"budget_mode": config["mode"]}
 
             if config["mode"] == "paycheck":
-                self.db.set_setting("monthly_income", config["monthly_income"])
-                self.db.set_setting("days_until_paycheck", config["days_until_paycheck"])
+                settings["monthly_income"] = config["monthly_income"]
+                settings["days_until_paycheck"] = config["days_until_paycheck"]
             else:
-                self.db.set_setting("total_money", config["total_money"])
-
-            for exp in expenses:
-                self.db.add_expense(exp["name"], exp["amount"], exp["is_fixed"])
+                settings["total_money"] = config["total_money"]
 
             # Mark as onboarded
-            self.db.set_setting("onboarded", True)
+            settings["onboarded"] = True
+
+            with self.db.bulk():
+                for exp in expenses:
+                    self.db.add_expense(exp["name"], exp["amount"], self.user_id, exp["is_fixed"])
+                self.db.set_settings(settings, self.user_id)
+            self.saved_expenses = expenses
 
             # Step 4: Show first number
             self.show_first_number(config, expenses)
@@ -7,6 +7,13 @@ Includes platform-aware console helpers and validation utilities.
 import os
 import sys
 import platform
+from typing import Optional
+
+# Clear screen and move the cursor home; avoids spawning a shell per redraw
+_ANSI_CLEAR = "\x1b[2J\x1b[H"
+
+# Whether the Windows console accepts ANSI sequences (None until checked)
+_windows_vt_enabled: Optional[bool] = None
 
 
 def configure_console_encoding():
@@ -26,6 +33,50 @@ def configure_console_encoding():
             pass
 
 
+def _enable_windows_vt_mode() -> bool:
+    """
+    Turn on ANSI escape handling for the Windows console.
+
+    Returns:
+        True if the console now processes virtual terminal sequences
+    """
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except Exception:
+        return False
+
+
+def clear_screen() -> None:
+    """
+    Clear the terminal screen.
+
+    Writes an ANSI escape sequence instead of running 'clear'/'cls'. On
+    Windows consoles without virtual terminal support, falls back to 'cls'.
+    """
+    global _windows_vt_enabled
+
+    if os.name == 'nt':
+        if _windows_vt_enabled is None:
+            # ANSICON and Windows Terminal interpret ANSI sequences themselves
+            _windows_vt_enabled = (
+                bool(os.environ.get("ANSICON") or os.environ.get("WT_SESSION"))
+                or _enable_windows_vt_mode()
+            )
+        if not _windows_vt_enabled:
+            os.system('cls')
+            return
+
+    sys.stdout.write(_ANSI_CLEAR)
+    sys.stdout.flush()
+
+
 def safe_print(text: str, fallback_char: str = '?') -> None:
     """
     Print text with encoding fallback for Windows compatibility.
@@ -62,8 +113,11 @@ def validate_database_access(db_path: str, encryption_key: str) -> tuple[bool, s
     try:
         from .database import EncryptedDatabase
         db = EncryptedDatabase(db_path=db_path, encryption_key=encryption_key)
-        # Try to read a setting (will fail if key is wrong)
-        db.get_setting("onboarded")
+        try:
+            # Try to read a setting (will fail if key is wrong)
+            db.get_setting("onboarded", 1)
+        finally:
+            db.close()
         return True, ""
     except Exception as e:
         error_msg = (
@@ -37,6 +37,18 @@ def mock_encryption_key():
     return Fernet.generate_key()
 
 
+@pytest.fixture
+def db(temp_db_path, mock_encryption_key):
+    """Provide an encrypted database with users 1 (alice) and 2 (bob)."""
+    from src.database import EncryptedDatabase
+    database = EncryptedDatabase(temp_db_path, encryption_key=mock_encryption_key.decode())
+    # Users 1 and 2, so rows written in tests satisfy the foreign keys
+    database.create_user("alice", "hash")
+    database.create_user("bob", "hash")
+    yield database
+    database.close()
+
+
 @pytest.fixture
 def sample_transactions():
     """Provide sample transaction data for testing."""
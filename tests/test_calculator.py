@@ -8,7 +8,7 @@ from src.calculator import BudgetCalculator, Expense, Transaction
 
 
 class TestExpense:
-    """Test Expense dataclass."""
+    """Test Expense record."""
 
     def test_create_expense(self):
         """Test creating a valid expense."""
@@ -24,7 +24,7 @@ class TestExpense:
 
 
 class TestTransaction:
-    """Test Transaction dataclass."""
+    """Test Transaction record."""
 
     def test_create_transaction(self):
         """Test creating a valid transaction."""
@@ -59,6 +59,41 @@ class TestBudgetCalculator:
         assert len(calc.expenses) == 2
         assert calc.get_total_expenses() == 1800.0
 
+    def test_add_expenses_bulk(self):
+        """Test adding expenses from database-style rows."""
+        calc = BudgetCalculator()
+        calc.add_expenses_bulk([
+            {"id": 1, "name": "Rent", "amount": 1500.0, "is_fixed": True, "frequency": "monthly"},
+            {"id": 2, "name": "Groceries", "amount": 300.0, "is_fixed": False},
+        ])
+
+        assert len(calc.expenses) == 2
+        assert calc.expenses[1].frequency == "monthly"
+        assert calc.get_total_expenses() == 1800.0
+
+    def test_add_expenses_bulk_rejects_whole_batch(self):
+        """Test that one invalid row leaves the expense list unchanged."""
+        calc = BudgetCalculator()
+        with pytest.raises(ValueError, match="cannot be negative"):
+            calc.add_expenses_bulk([
+                {"name": "Rent", "amount": 1500.0},
+                {"name": "Bad", "amount": -1.0},
+            ])
+
+        assert calc.expenses == []
+
+    def test_set_expenses_replaces_list(self):
+        """Test that set_expenses swaps out the existing expenses."""
+        calc = BudgetCalculator()
+        calc.add_expense("Old", 100.0)
+        calc.set_expenses([{"name": "Rent", "amount": 1500.0}])
+
+        assert [exp.name for exp in calc.expenses] == ["Rent"]
+
+        with pytest.raises(ValueError):
+            calc.set_expenses([{"name": "Bad", "amount": -1.0}])
+        assert [exp.name for exp in calc.expenses] == ["Rent"]
+
     def test_add_transaction(self):
         """Test adding transactions."""
         calc = BudgetCalculator()
@@ -67,6 +102,23 @@ class TestBudgetCalculator:
 
         assert len(calc.transactions) == 2
 
+    def test_add_transactions_bulk(self):
+        """Test adding many transactions in one call."""
+        calc = BudgetCalculator()
+        calc.add_transactions_bulk([25.0, 15.0], ["Coffee", "Snack"], categories=[None, "Food"])
+
+        assert len(calc.transactions) == 2
+        assert calc.transactions[1].category == "Food"
+        assert calc.get_today_spending() == 40.0
+
+    def test_add_transactions_bulk_rejects_whole_batch(self):
+        """Test that one invalid amount rejects the entire batch."""
+        calc = BudgetCalculator()
+        with pytest.raises(ValueError, match="cannot be negative"):
+            calc.add_transactions_bulk([25.0, -5.0], ["Coffee", "Refund"])
+
+        assert calc.transactions == []
+
     def test_get_today_spending(self):
         """Test getting today's spending."""
         calc = BudgetCalculator()
@@ -150,8 +202,8 @@ class TestBudgetCalculator:
         result = calc.calculate_fixed_pool_mode(total_money=5000.0)
 
         assert result["total_expenses"] == 0.0
-        assert result["months_remaining"] == float('inf')
-        assert result["days_remaining"] == float('inf')
+        assert result["months_remaining"] is None
+        assert result["days_remaining"] is None
         assert result["daily_limit"] == 0.0
 
     def test_fixed_pool_mode_negative_money_raises_error(self):
@@ -254,3 +254,96 @@ class TestCLIErrorHandling:
         """
         # Expected: ValueError listing valid modes
         pass
+
+
+class TestCLIDatabase:
+    """Test CLI paths against a real temporary database."""
+
+    @pytest.fixture
+    def cli(self, temp_db_path, mock_encryption_key, monkeypatch):
+        from src.cli import CLI
+        monkeypatch.setenv("DB_ENCRYPTION_KEY", mock_encryption_key.decode())
+        cli = CLI(db_path=temp_db_path)
+        cli._interactive = False
+        monkeypatch.setattr(cli, "clear_screen", lambda: None)
+        yield cli
+        cli.db.close()
+
+    @staticmethod
+    def _answer(monkeypatch, *answers):
+        """Feed answers to the CLI's input() prompts in order."""
+        replies = iter(answers)
+        monkeypatch.setattr("builtins.input", lambda prompt="": next(replies))
+
+    def test_budget_settings_read_for_local_user(self, cli):
+        """Test that budget settings are read for the CLI's local account, with defaults."""
+        cli.db.set_setting("budget_mode", "paycheck", cli.user_id)
+
+        settings = cli._get_budget_settings()
+
+        assert settings["budget_mode"] == "paycheck"
+        assert settings["days_until_paycheck"] == 30
+
+    def test_load_expenses_for_local_user(self, cli):
+        """Test that startup loads only the local account's expenses into the calculator."""
+        cli.db.set_setting("onboarded", True, cli.user_id)
+        cli.db.add_expense("Rent", 1500.0, cli.user_id)
+        other = cli.db.create_user("someone", "hash")
+        cli.db.add_expense("Not mine", 99.0, other)
+
+        cli._ensure_ready()
+
+        assert [exp.name for exp in cli.calculator.expenses] == ["Rent"]
+        assert cli.calculator.get_total_expenses() == 1500.0
+
+    def test_manage_expenses_add_then_remove(self, cli, monkeypatch):
+        """Test adding and removing an expense through the manage-expenses menu."""
+        cli.db.set_setting("onboarded", True, cli.user_id)
+        cli._ensure_ready()
+
+        self._answer(monkeypatch, "1", "Gym", "40", "y", "5")
+        cli.manage_expenses()
+        expenses = cli.db.get_expenses(cli.user_id)
+        assert [(exp["name"], exp["amount"]) for exp in expenses] == [("Gym", 40.0)]
+
+        self._answer(monkeypatch, "4", str(expenses[0]["id"]), "5")
+        cli.manage_expenses()
+        assert cli.db.get_expenses(cli.user_id) == []
+        assert cli.calculator.expenses == []
+
+    def test_import_expenses_replaces_existing(self, cli, monkeypatch, tmp_path):
+        """Test importing a CSV in replace mode through the manage-expenses menu."""
+        cli.db.set_setting("onboarded", True, cli.user_id)
+        cli.db.add_expense("Old", 10.0, cli.user_id)
+        cli._ensure_ready()
+        csv_file = tmp_path / "expenses.csv"
+        csv_file.write_text("name,amount,is_fixed\nRent,1500,yes\nGroceries,300,no\n")
+
+        self._answer(monkeypatch, "2", "n", str(csv_file), "y", "2", "5")
+        cli.manage_expenses()
+
+        expenses = cli.db.get_expenses(cli.user_id)
+        assert sorted((exp["name"], exp["is_fixed"]) for exp in expenses) == [
+            ("Groceries", False), ("Rent", True)
+        ]
+        assert cli.calculator.get_total_expenses() == 1800.0
+
+
+class TestOnboardingSummary:
+    """Test the summary shown at the end of onboarding."""
+
+    def test_fixed_pool_summary_shows_expenses(self, monkeypatch, capsys):
+        """Test that the fixed-pool summary prints the expense total and how long money lasts."""
+        from src.onboarding import Onboarding
+        onboarding = Onboarding(db=None, user_id=1)
+        monkeypatch.setattr(onboarding, "clear_screen", lambda: None)
+        monkeypatch.setattr("builtins.input", lambda prompt="": "")
+
+        onboarding.show_first_number(
+            {"mode": "fixed_pool", "total_money": 3000.0},
+            [{"name": "Rent", "amount": 1000.0, "is_fixed": True}],
+        )
+
+        output = capsys.readouterr().out
+        assert "Monthly Expenses:      $  1,000.00" in output
+        assert "3.0 months" in output
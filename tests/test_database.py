@@ -157,3 +157,546 @@ class TestDatabaseBackup:
     def test_database_restore(self, temp_db_path):
         """Test restoring from a backup."""
         pass
+
+
+class TestSettingsOperations:
+    """Test encrypted settings storage and retrieval."""
+
+    def test_get_settings_bulk(self, db):
+        """Test fetching several settings in one call."""
+        db.set_setting("budget_mode", "paycheck", 1)
+        db.set_setting("monthly_income", 4000.0, 1)
+        db.set_setting("monthly_income", 9999.0, 2)
+
+        settings = db.get_settings_bulk(["budget_mode", "monthly_income", "total_money"], 1)
+
+        assert settings == {"budget_mode": "paycheck", "monthly_income": 4000.0}
+
+    def test_get_setting_cached_until_set(self, db, temp_db_path):
+        """Test that reads are served from the cache and writes invalidate it."""
+        from contextlib import closing
+        db.set_setting("monthly_income", 4000.0, 1)
+        assert db.get_setting("monthly_income", 1) == 4000.0
+
+        with closing(sqlite3.connect(temp_db_path)) as conn, conn:
+            conn.execute("DELETE FROM settings WHERE key = 'monthly_income'")
+        assert db.get_setting("monthly_income", 1) == 4000.0
+
+        db.clear_settings_cache()
+        assert db.get_setting("monthly_income", 1) is None
+
+        db.set_setting("monthly_income", 5000.0, 1)
+        assert db.get_setting("monthly_income", 1) == 5000.0
+
+    def test_settings_cache_evicts_least_recently_used(self, db, temp_db_path, monkeypatch):
+        """Test that the settings cache stays bounded and keeps recent entries."""
+        from contextlib import closing
+        monkeypatch.setattr("src.database._SETTINGS_CACHE_SIZE", 2)
+        for key in ("a", "b", "c"):
+            db.set_setting(key, key, 1)
+        db.get_setting("a", 1)
+        db.get_setting("b", 1)
+        db.get_setting("a", 1)
+        db.get_setting("c", 1)
+
+        with closing(sqlite3.connect(temp_db_path)) as conn, conn:
+            conn.execute("DELETE FROM settings")
+        # Only the two most recently used values are still served from the cache
+        assert [db.get_setting(key, 1) for key in ("a", "c", "b")] == ["a", "c", None]
+
+    def test_decrypt_results_cached(self, db):
+        """Test that decrypting the same ciphertext twice reuses the result."""
+        token = db._encrypt("secret")
+
+        from src.database import _decrypt_cached
+        hits = _decrypt_cached.cache_info().hits
+
+        assert db._decrypt(token) == "secret"
+        assert db._decrypt(token) == "secret"
+        assert _decrypt_cached.cache_info().hits == hits + 1
+
+    def test_unclosed_instance_freed_without_gc(self, temp_db_path, mock_encryption_key):
+        """Test that dropping an unclosed instance releases it by refcount alone."""
+        import gc
+        import weakref
+        from src.database import EncryptedDatabase
+        database = EncryptedDatabase(temp_db_path, encryption_key=mock_encryption_key.decode())
+        database.get_setting("budget_mode", 1)
+        ref = weakref.ref(database)
+
+        gc.disable()
+        try:
+            del database
+            assert ref() is None
+        finally:
+            gc.enable()
+
+    def test_legacy_text_values_still_readable(self, db):
+        """Test that Fernet and base64 text values decrypt alongside raw bytes."""
+        import base64
+        legacy_fernet = db.cipher.encrypt(b"fernet").decode()
+        legacy_text = base64.urlsafe_b64encode(db._encrypt("text")).decode()
+        current = db._encrypt("new")
+
+        assert isinstance(current, bytes)
+        assert db._decrypt(legacy_fernet) == "fernet"
+        assert db._decrypt(legacy_text) == "text"
+        assert db._decrypt(current) == "new"
+
+    def test_settings_stored_as_blobs(self, db):
+        """Test that new setting values are bound as BLOBs, not text."""
+        db.set_setting("budget_mode", "paycheck", 1)
+        with db.read_connection() as conn:
+            row = conn.execute("SELECT typeof(value) FROM settings WHERE key = 'budget_mode'").fetchone()
+
+        assert row[0] == "blob"
+
+    def test_setting_values_round_trip(self, db):
+        """Test that nested values and non-string keys read back as json would."""
+        db.set_setting("pool", {"balance": 12.5, "history": [1, 2], 3: True}, 1)
+        db.clear_settings_cache()
+
+        assert db.get_setting("pool", 1) == {"balance": 12.5, "history": [1, 2], "3": True}
+
+    def test_setting_lookup_uses_primary_key(self, db):
+        """Test that settings are found by a single (user_id, key) primary key seek."""
+        with db.read_connection() as conn:
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT value FROM settings WHERE key = ? AND user_id = ?", ("k", 1)
+            ))
+            indexes = {row[1] for row in conn.execute("PRAGMA index_list(settings)")}
+
+        assert "PRIMARY KEY" in plan
+        assert "idx_settings_user_key" not in indexes
+
+    def test_rowid_settings_rebuilt_on_open(self, db, temp_db_path, mock_encryption_key):
+        """Test that a settings table with an id column is rebuilt keeping its rows."""
+        import sqlite3
+        from contextlib import closing
+        from src.database import EncryptedDatabase
+        db.set_setting("mode", "paycheck", 1)
+        with closing(sqlite3.connect(temp_db_path)) as conn, conn:
+            conn.execute("ALTER TABLE settings RENAME TO settings_old")
+            conn.execute("""
+                CREATE TABLE settings (
+                    id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, key TEXT NOT NULL,
+                    value TEXT NOT NULL, created_at TEXT NOT NULL, updated_at TEXT NOT NULL,
+                    UNIQUE(user_id, key)
+                )
+            """)
+            conn.execute(
+                "INSERT INTO settings (user_id, key, value, created_at, updated_at) "
+                "SELECT user_id, key, value, created_at, updated_at FROM settings_old"
+            )
+            conn.execute("DROP TABLE settings_old")
+            conn.execute("DELETE FROM schema_version WHERE version = 9")
+
+        EncryptedDatabase(temp_db_path, encryption_key=mock_encryption_key.decode()).close()
+
+        with db.read_connection() as conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(settings)")]
+        db.clear_settings_cache()
+        assert "id" not in columns
+        assert db.get_setting("mode", 1) == "paycheck"
+
+    def test_rowid_settings_rebuild_keeps_orphan_rows(self, db, temp_db_path, mock_encryption_key):
+        """Test that upgrading keeps settings whose user_id has no user row."""
+        import sqlite3
+        from contextlib import closing
+        from src.database import EncryptedDatabase
+        orphan = db._encrypt(b'"legacy"')
+        with closing(sqlite3.connect(temp_db_path)) as conn, conn:
+            conn.execute("DROP TABLE settings")
+            conn.execute("""
+                CREATE TABLE settings (
+                    id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, key TEXT NOT NULL,
+                    value TEXT NOT NULL, created_at TEXT NOT NULL, updated_at TEXT NOT NULL,
+                    UNIQUE(user_id, key)
+                )
+            """)
+            # Written before foreign keys were enforced; user 7 never existed
+            conn.execute(
+                "INSERT INTO settings (user_id, key, value, created_at, updated_at) "
+                "VALUES (7, 'budget_mode', ?, 'now', 'now')", (orphan,)
+            )
+            conn.execute("DELETE FROM schema_version WHERE version = 9")
+
+        upgraded = EncryptedDatabase(temp_db_path, encryption_key=mock_encryption_key.decode())
+        try:
+            assert upgraded.get_setting("budget_mode", 7) == "legacy"
+            # Enforcement is back on for new writes
+            with pytest.raises(sqlite3.IntegrityError):
+                upgraded.add_transaction(1.0, "Orphan", 7)
+        finally:
+            upgraded.close()
+
+    def test_legacy_settings_reencrypted_on_open(self, db, temp_db_path, mock_encryption_key):
+        """Test that text settings become AES-GCM blobs and foreign ones are left alone."""
+        from contextlib import closing
+        from src.database import EncryptedDatabase
+        from cryptography.fernet import Fernet
+        foreign = Fernet(Fernet.generate_key()).encrypt(b'"other key"').decode()
+        with closing(sqlite3.connect(temp_db_path)) as conn, conn:
+            conn.execute(
+                "INSERT INTO settings (user_id, key, value, created_at, updated_at) VALUES "
+                "(1, 'legacy', ?, 'now', 'now'), (1, 'foreign', ?, 'now', 'now')",
+                (db.cipher.encrypt(b'"paycheck"').decode(), foreign)
+            )
+
+        EncryptedDatabase(temp_db_path, encryption_key=mock_encryption_key.decode()).close()
+
+        with db.read_connection() as conn:
+            types = dict(conn.execute("SELECT key, typeof(value) FROM settings").fetchall())
+        assert types == {"legacy": "blob", "foreign": "text"}
+        assert db.get_setting("legacy", 1) == "paycheck"
+
+    def test_non_finite_setting_values_rejected(self, db):
+        """Test that NaN and Infinity raise instead of being stored as null."""
+        with pytest.raises(ValueError, match="NaN or Infinity"):
+            db.set_setting("pool_balance", float("nan"), 1)
+        with pytest.raises(ValueError, match="NaN or Infinity"):
+            db.set_settings({"history": [1.0, float("inf")]}, 1)
+
+        assert db.get_setting("pool_balance", 1) is None
+
+    def test_json_only_setting_values_round_trip(self, db, temp_db_path):
+        """Test values the json module writes: wide integers and legacy NaN literals."""
+        import sqlite3
+        from contextlib import closing
+        wide = 2 ** 70
+        db.set_setting("wide", {"n": wide, "label": "x"}, 1)
+        # Written by an older version: json.dumps output in a Fernet token
+        with closing(sqlite3.connect(temp_db_path)) as conn, conn:
+            conn.execute(
+                "INSERT INTO settings (user_id, key, value, created_at, updated_at) "
+                "VALUES (1, 'legacy', ?, 'now', 'now')",
+                (db.cipher.encrypt(b'[NaN, Infinity]').decode(),)
+            )
+
+        assert db.get_setting("wide", 1) == {"n": wide, "label": "x"}
+        legacy = db.get_setting("legacy", 1)
+        assert legacy[0] != legacy[0] and legacy[1] == float("inf")
+
+    def test_decrypt_setting_reads_raw_values(self, db):
+        """Test that raw values from read_connection decrypt to the stored settings."""
+        db.set_setting("budget_mode", "paycheck", 1)
+        db.set_setting("budget_mode", "fixed_pool", 2)
+
+        with db.read_connection() as conn:
+            values = [row[0] for row in conn.execute("SELECT value FROM settings WHERE key = 'budget_mode'")]
+
+        assert sorted(db.decrypt_setting(value) for value in values) == ["fixed_pool", "paycheck"]
+
+    def test_get_settings_bulk_warms_cache(self, db, temp_db_path):
+        """Test that values fetched in bulk are served from the cache afterwards."""
+        from contextlib import closing
+        db.set_setting("budget_mode", "paycheck", 1)
+        db.get_settings_bulk(["budget_mode", "missing"], 1)
+
+        with closing(sqlite3.connect(temp_db_path)) as conn, conn:
+            conn.execute("DELETE FROM settings")
+
+        assert db.get_setting("budget_mode", 1) == "paycheck"
+        assert db.get_setting("missing", 1) is None
+
+    def test_get_settings_bulk_no_keys(self, db):
+        """Test that an empty key list returns an empty dict."""
+        assert db.get_settings_bulk([], 1) == {}
+
+    def test_set_settings_writes_all_and_invalidates_cache(self, db):
+        """Test that set_settings upserts every key and drops their cached values."""
+        db.set_setting("budget_mode", "paycheck", 1)
+        assert db.get_setting("budget_mode", 1) == "paycheck"
+
+        db.set_settings({"budget_mode": "fixed_pool", "total_money": 5000.0, "target_end_date": None}, 1)
+
+        assert db.get_settings_bulk(["budget_mode", "total_money", "target_end_date"], 1) == {
+            "budget_mode": "fixed_pool", "total_money": 5000.0, "target_end_date": None
+        }
+        assert db.get_setting("budget_mode", 1) == "fixed_pool"
+
+
+class TestExpenseOperations:
+    """Test encrypted expense storage and retrieval."""
+
+    def test_get_expense_summary(self, db):
+        """Test that the summary returns the rows and their total in one call."""
+        db.add_expense("Rent", 1500.0, 1)
+        db.add_expense("Groceries", 300.5, 1, is_fixed=False)
+        db.add_expense("Other user", 99.0, 2)
+
+        expenses, total = db.get_expense_summary(1)
+
+        assert {exp["name"] for exp in expenses} == {"Rent", "Groceries"}
+        assert total == pytest.approx(1800.5)
+
+    def test_get_expense_summary_empty(self, db):
+        """Test that a user with no expenses gets an empty list and zero total."""
+        assert db.get_expense_summary(1) == ([], 0.0)
+
+    def test_get_expenses_uses_index(self, db):
+        """Test that listing a user's expenses needs no separate sort step."""
+        with db.read_connection() as conn:
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM expenses WHERE user_id = ? ORDER BY created_at DESC", (1,)
+            ))
+
+        assert "idx_expenses_user_created" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_update_expense_validates_like_add(self, db):
+        """Test that update_expense applies the same field checks as add_expense."""
+        expense_id = db.add_expense("Rent", 1500.0, 1)
+
+        with pytest.raises(ValueError, match="name is required"):
+            db.update_expense(expense_id, 1, name="   ")
+        with pytest.raises(ValueError, match="cannot be negative"):
+            db.update_expense(expense_id, 1, amount=-1.0)
+
+        db.update_expense(expense_id, 1, name="  Mortgage  ")
+        assert db.get_expense_by_id(expense_id, 1)["name"] == "Mortgage"
+
+    def test_update_expense_keeps_unset_fields(self, db):
+        """Test that a partial update only changes the fields passed."""
+        expense_id = db.add_expense("Gym", 40.0, 1, is_fixed=True, frequency="weekly")
+
+        db.update_expense(expense_id, 1, amount=45.0, is_fixed=False)
+
+        expense = db.get_expense_by_id(expense_id, 1)
+        assert (expense["name"], expense["amount"], expense["is_fixed"], expense["frequency"]) == \
+            ("Gym", 45.0, False, "weekly")
+
+    def test_reads_use_read_only_connection(self, db):
+        """Test that reads go through a separate connection that cannot write."""
+        db.add_expense("Rent", 1500.0, 1)
+
+        with db.read_connection() as conn:
+            with pytest.raises(sqlite3.OperationalError, match="readonly"):
+                conn.execute("DELETE FROM expenses")
+
+        assert [exp["name"] for exp in db.get_expenses(1)] == ["Rent"]
+
+    def test_reads_survive_directory_change(self, tmp_path, mock_encryption_key, monkeypatch):
+        """Test that a database opened by relative path is still read after a chdir()."""
+        from src.database import EncryptedDatabase
+        (tmp_path / "first").mkdir()
+        (tmp_path / "second").mkdir()
+        monkeypatch.chdir(tmp_path / "first")
+        database = EncryptedDatabase("rel.db", encryption_key=mock_encryption_key.decode())
+        try:
+            database.create_user("alice", "hash")
+            database.add_expense("Rent", 1500.0, 1)
+            monkeypatch.chdir(tmp_path / "second")
+
+            assert [exp["name"] for exp in database.get_expenses(1)] == ["Rent"]
+        finally:
+            database.close()
+
+    def test_bulk_rolls_back_on_error(self, db):
+        """Test that writes grouped in bulk() are undone together on any error."""
+        db.add_expense("Rent", 1500.0, 1)
+
+        with pytest.raises(RuntimeError):
+            with db.bulk():
+                db.bulk_add_expenses([{"name": "Gym", "amount": 40.0}], 1, replace=True)
+                raise RuntimeError("abort")
+
+        assert [exp["name"] for exp in db.get_expenses(1)] == ["Rent"]
+
+    def test_bulk_add_expenses(self, db):
+        """Test that valid rows are inserted and invalid rows reported."""
+        count, errors = db.bulk_add_expenses([
+            {"name": "Rent", "amount": 1500.0, "is_fixed": True},
+            {"name": "Bad", "amount": -5.0},
+            {"name": "Gym", "amount": 40.0, "is_fixed": False, "frequency": "weekly"},
+        ], 1)
+
+        assert count == 2
+        assert len(errors) == 1 and "Bad" in errors[0]
+        expenses = {exp["name"]: exp for exp in db.get_expenses(1)}
+        assert set(expenses) == {"Rent", "Gym"}
+        assert expenses["Gym"]["frequency"] == "weekly"
+
+    def test_bulk_add_expenses_replace(self, db):
+        """Test that replace mode clears only this user's existing expenses."""
+        db.add_expense("Old", 10.0, 1)
+        db.add_expense("Other user", 20.0, 2)
+
+        db.bulk_add_expenses([{"name": "New", "amount": 30.0}], 1, replace=True)
+
+        assert [exp["name"] for exp in db.get_expenses(1)] == ["New"]
+        assert [exp["name"] for exp in db.get_expenses(2)] == ["Other user"]
+
+
+class TestTransactionQueries:
+    """Test transaction date handling in range queries."""
+
+    def test_dates_stored_as_utc(self, db):
+        """Test that offset and naive dates are stored as UTC ISO strings."""
+        from datetime import datetime, timedelta, timezone
+        db.add_transaction(10.0, "Offset", 1, date=datetime(2024, 1, 1, 20, 0, tzinfo=timezone(timedelta(hours=-7))))
+        db.add_transaction(5.0, "Naive", 1, date=datetime(2024, 1, 2, 9, 30))
+
+        dates = sorted(txn["date"] for txn in db.get_transactions(1))
+        assert dates == ["2024-01-02T03:00:00+00:00", "2024-01-02T09:30:00+00:00"]
+
+    def test_period_sum_uses_utc_boundaries(self, db):
+        """Test that a non-UTC transaction lands in the right UTC period."""
+        from datetime import datetime, timedelta, timezone
+        utc = timezone.utc
+        # 20:00 at UTC-7 on Jan 1 is 03:00 UTC on Jan 2
+        db.add_transaction(10.0, "Late dinner", 1, date=datetime(2024, 1, 1, 20, 0, tzinfo=timezone(timedelta(hours=-7))))
+        db.add_transaction(3.0, "Refund", 1, date=datetime(2024, 1, 2, 12, 0, tzinfo=utc), category="income")
+
+        jan_1 = db.get_transactions_sum_for_period(1, datetime(2024, 1, 1, tzinfo=utc), datetime(2024, 1, 2, tzinfo=utc))
+        jan_2 = db.get_transactions_sum_for_period(1, datetime(2024, 1, 2, tzinfo=utc), datetime(2024, 1, 3, tzinfo=utc))
+
+        assert jan_1 == 0.0
+        assert jan_2 == pytest.approx(7.0)
+
+    def test_transaction_queries_use_composite_index(self, db):
+        """Test that listing and date filters seek the (user_id, date, ...) index."""
+        with db.read_connection() as conn:
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM transactions WHERE user_id = ? AND date >= ? ORDER BY date DESC",
+                (1, "2024-01-01")
+            ))
+            indexes = {row[1] for row in conn.execute("PRAGMA index_list(transactions)")}
+
+        assert "idx_transactions_user_date_amount" in plan
+        assert "TEMP B-TREE" not in plan
+        assert "idx_transactions_user_id" not in indexes
+
+    def test_same_second_transactions_keep_their_order(self, db):
+        """Test that sub-second dates are stored and ordered, with and without a fraction."""
+        from datetime import datetime, timezone
+        base = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+        for micro, label in ((0, "First"), (250_000, "Second"), (750_000, "Third")):
+            db.add_transaction(1.0, label, 1, date=base.replace(microsecond=micro))
+
+        assert [txn["description"] for txn in db.get_transactions(1)] == ["Third", "Second", "First"]
+        assert db.get_transactions(1)[0]["date"] == "2024-01-01T12:00:00.750000+00:00"
+
+    def test_get_transactions_filters_and_limit(self, db):
+        """Test every filter combination returns the matching rows newest first."""
+        from datetime import datetime, timezone
+        for day in (1, 2, 3, 4):
+            db.add_transaction(float(day), f"Day {day}", 1, date=datetime(2024, 1, day, 12, tzinfo=timezone.utc))
+        start, end = datetime(2024, 1, 2, tzinfo=timezone.utc), datetime(2024, 1, 3, 23, tzinfo=timezone.utc)
+
+        def amounts(**kwargs):
+            return [txn["amount"] for txn in db.get_transactions(1, **kwargs)]
+
+        assert amounts() == [4.0, 3.0, 2.0, 1.0]
+        assert amounts(start_date=start) == [4.0, 3.0, 2.0]
+        assert amounts(end_date=end) == [3.0, 2.0, 1.0]
+        assert amounts(start_date=start, end_date=end, limit=1) == [3.0]
+
+    def test_iter_transactions_releases_reader(self, db, temp_db_path):
+        """Test that a partly consumed iterator ends its read when closed."""
+        from contextlib import closing
+        for amount in (1.0, 2.0, 3.0):
+            db.add_transaction(amount, "Coffee", 1)
+
+        def checkpoint_busy():
+            # A TRUNCATE checkpoint reports busy while any reader holds a snapshot
+            with closing(sqlite3.connect(temp_db_path, timeout=0)) as conn:
+                return conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+
+        rows = db.iter_transactions(1)
+        assert next(rows)["description"] == "Coffee"
+        assert checkpoint_busy() == 1
+        rows.close()
+
+        assert checkpoint_busy() == 0
+        assert len(list(db.iter_transactions(1))) == 3
+
+    def test_bulk_context_commits_once(self, db):
+        """Test that writes inside bulk() commit together or not at all."""
+        with db.bulk():
+            db.add_transaction(1.0, "One", 1)
+            db.bulk_add_transactions([{"amount": 2.0, "description": "Two"}], 1)
+        assert len(db.get_transactions(1)) == 2
+
+        with pytest.raises(ValueError):
+            with db.bulk():
+                db.add_transaction(3.0, "Three", 1)
+                db.add_transaction(-1.0, "Invalid", 1)
+        assert len(db.get_transactions(1)) == 2
+
+    def test_bulk_context_defers_foreign_keys(self, db, temp_db_path):
+        """Test that bulk() checks foreign keys at commit rather than per row."""
+        import sqlite3
+        from contextlib import closing
+        with db.bulk():
+            db.add_transaction(1.0, "Before signup", 3)
+            db.create_user("carol", "hash")
+        assert len(db.get_transactions(3)) == 1
+
+        with pytest.raises(sqlite3.IntegrityError):
+            with db.bulk():
+                db.add_transaction(1.0, "Orphan", 99)
+        assert db.get_transactions(99) == []
+
+        # The failed bulk() left no transaction open, so later writes commit
+        db.add_transaction(2.0, "After", 1)
+        with closing(sqlite3.connect(temp_db_path)) as conn:
+            assert conn.execute("SELECT description FROM transactions WHERE user_id = 1").fetchall() == [("After",)]
+
+    def test_total_spending_today(self, db):
+        """Test that today's total nets income and ignores other days."""
+        from datetime import datetime, timedelta, timezone
+        now = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+        db.add_transaction(10.0, "Lunch", 1, date=now)
+        db.add_transaction(4.0, "Refund", 1, date=now, category="income")
+        db.add_transaction(50.0, "Yesterday", 1, date=now - timedelta(days=1))
+        db.add_transaction(70.0, "Tomorrow", 1, date=now + timedelta(days=1))
+
+        assert db.get_total_spending_today(1, "UTC") == pytest.approx(6.0)
+
+    def test_spending_sum_reads_only_the_index(self, db):
+        """Test that the period sum is answered from a covering index."""
+        with db.read_connection() as conn:
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT SUM(CASE WHEN category = 'income' THEN -amount ELSE amount END) "
+                "FROM transactions WHERE user_id = ? AND date >= ? AND date < ?", (1, "a", "b")
+            ))
+
+        assert "COVERING INDEX idx_transactions_user_date_amount" in plan
+
+    def test_bulk_add_transactions(self, db):
+        """Test that valid rows are inserted together and invalid rows reported."""
+        from datetime import datetime, timezone
+        count, errors = db.bulk_add_transactions([
+            {"amount": 4.5, "description": "Coffee", "date": datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)},
+            {"amount": 0, "description": "Nothing"},
+            {"amount": 20.0, "description": "Lunch", "category": "Food"},
+        ], 1)
+
+        assert count == 2
+        assert len(errors) == 1 and "Nothing" in errors[0]
+        txns = {txn["description"]: txn for txn in db.get_transactions(1)}
+        assert set(txns) == {"Coffee", "Lunch"}
+        assert txns["Coffee"]["date"] == "2024-01-01T08:00:00+00:00"
+        assert txns["Lunch"]["category"] == "Food"
+
+    def test_foreign_keys_enforced(self, db):
+        """Test that rows cannot be written for a user that does not exist."""
+        with pytest.raises(sqlite3.IntegrityError):
+            db.add_transaction(1.0, "Orphan", 99)
+
+    def test_legacy_dates_normalized_on_open(self, db, temp_db_path, mock_encryption_key):
+        """Test that the migration rewrites dates stored in older formats."""
+        import sqlite3
+        from contextlib import closing
+        from src.database import EncryptedDatabase
+        with closing(sqlite3.connect(temp_db_path)) as conn, conn:
+            conn.execute(
+                "INSERT INTO transactions (user_id, date, amount, description, created_at) VALUES (1, ?, 1.0, 'Old', ?)",
+                ("2024-03-01T05:00:00.123456-05:00", "2024-03-01T10:00:00+00:00")
+            )
+            conn.execute("DELETE FROM schema_version WHERE version = 5")
+
+        EncryptedDatabase(temp_db_path, encryption_key=mock_encryption_key.decode()).close()
+
+        assert [txn["date"] for txn in db.get_transactions(1)] == ["2024-03-01T10:00:00.123456+00:00"]
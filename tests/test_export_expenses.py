@@ -85,19 +85,20 @@ class TestCSVExport:
             {'name': 'Rent', 'amount': 1500.0, 'is_fixed': True},
         ]
 
-        # Try to write to a read-only directory (or invalid path on Windows)
-        # Windows: Use a path that definitely doesn't exist and can't be created
-        invalid_path = "Z:\\nonexistent\\impossible\\path\\export.csv"
+        # A directory that does not exist, so the file cannot be created
+        invalid_path = str(tmp_path / "nonexistent" / "export.csv")
 
         # Should raise an error (IOError, OSError, or PermissionError)
         with pytest.raises((IOError, OSError, PermissionError, ValueError)):
             export_to_csv(expenses, invalid_path)
 
-    def test_export_csv_invalid_path(self, tmp_path):
+    def test_export_csv_invalid_path(self, tmp_path, monkeypatch):
         """Test CSV export with invalid file path.
 
         Tests handling of paths with invalid characters or formats.
         """
+        # Relative paths resolve against tmp_path, so nothing lands in the checkout
+        monkeypatch.chdir(tmp_path)
         expenses = [
             {'name': 'Rent', 'amount': 1500.0, 'is_fixed': True},
         ]